@@ -0,0 +1,55 @@
+from logging.config import fileConfig
+
+from alembic import context
+from app import models  # noqa: F401 - registers tables on Base.metadata
+from app.database import Base, engine
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Created with raw SQL in 0003_listing_search, so they are not on the models' metadata
+RAW_SQL_INDEXES = {"ix_crops_name_trgm", "ix_vendors_location_trgm"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from proposing to drop search objects the models don't describe"""
+    if type_ == "table" and name and (name.endswith("_fts") or "_fts_" in name):
+        # FTS5 virtual tables and their shadow tables (crops_fts_data, crops_fts_idx, ...)
+        return False
+    if type_ == "index" and name in RAW_SQL_INDEXES:
+        return False
+    return True
+
+
+def run_migrations_offline():
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        render_as_batch=engine.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite"
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,133 @@
+"""Baseline schema
+
+Creates the tables previously bootstrapped by Base.metadata.create_all on
+startup. Tables that already exist are left alone, so databases created that
+way can simply be upgraded.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String()),
+            sa.Column("hashed_password", sa.String()),
+            sa.Column("full_name", sa.String()),
+            sa.Column("user_type", sa.String()),
+            sa.Column("location", sa.String()),
+            sa.Column("phone", sa.String()),
+            sa.Column("soil_type", sa.String(), nullable=True),
+            sa.Column("farm_size", sa.String(), nullable=True),
+            sa.Column("experience", sa.Integer(), nullable=True),
+            sa.Column("business_type", sa.String(), nullable=True),
+            sa.Column("business_name", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "farmers" not in existing:
+        op.create_table(
+            "farmers",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("location", sa.String()),
+            sa.Column("soil_type", sa.String()),
+            sa.Column("contact", sa.String(), unique=True),
+        )
+        op.create_index("ix_farmers_id", "farmers", ["id"])
+
+    if "vendors" not in existing:
+        op.create_table(
+            "vendors",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("product_type", sa.String()),
+            sa.Column("location", sa.String()),
+            sa.Column("contact", sa.String(), unique=True),
+        )
+        op.create_index("ix_vendors_id", "vendors", ["id"])
+
+    if "crops" not in existing:
+        op.create_table(
+            "crops",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("soil_type", sa.String()),
+            sa.Column("farmer_id", sa.Integer(), sa.ForeignKey("farmers.id")),
+            sa.Column("price", sa.Float()),
+            sa.Column("season", sa.String()),
+            sa.Column("status", sa.String()),
+        )
+        op.create_index("ix_crops_id", "crops", ["id"])
+
+    if "market_listings" not in existing:
+        op.create_table(
+            "market_listings",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("crop_id", sa.Integer(), sa.ForeignKey("crops.id")),
+            sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id")),
+            sa.Column("price", sa.Float()),
+            sa.Column("quantity", sa.Float()),
+            sa.Column("timestamp", sa.DateTime()),
+        )
+        op.create_index("ix_market_listings_id", "market_listings", ["id"])
+
+    if "transactions" not in existing:
+        op.create_table(
+            "transactions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("farmer_id", sa.Integer(), sa.ForeignKey("farmers.id")),
+            sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id")),
+            sa.Column("crop_id", sa.Integer(), sa.ForeignKey("crops.id")),
+            sa.Column("amount", sa.Float()),
+            sa.Column("date", sa.DateTime()),
+            sa.Column("notes", sa.Text()),
+        )
+        op.create_index("ix_transactions_id", "transactions", ["id"])
+
+    if "notifications" not in existing:
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("title", sa.String()),
+            sa.Column("message", sa.Text()),
+            sa.Column("type", sa.String()),
+            sa.Column("is_read", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+        op.create_index("ix_notifications_id", "notifications", ["id"])
+
+    if "farmer_recommendations" not in existing:
+        op.create_table(
+            "farmer_recommendations",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("farmer_id", sa.Integer(), sa.ForeignKey("farmers.id", ondelete="CASCADE")),
+            sa.Column("season", sa.String()),
+            sa.Column("soil_type", sa.String()),
+            sa.Column("recommendations", sa.JSON()),
+            sa.Column("computed_at", sa.DateTime()),
+        )
+        op.create_index("ix_farmer_recommendations_id", "farmer_recommendations", ["id"])
+        op.create_index("ix_farmer_recommendations_farmer_id", "farmer_recommendations", ["farmer_id"], unique=True)
+
+
+def downgrade():
+    for table in ("farmer_recommendations", "notifications", "transactions", "market_listings",
+                  "crops", "vendors", "farmers", "users"):
+        op.drop_table(table)
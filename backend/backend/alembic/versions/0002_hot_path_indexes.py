@@ -0,0 +1,39 @@
+"""Indexes for foreign keys, listing filters and notification polling
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002_hot_path_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_crops_farmer_id", "crops", ["farmer_id"]),
+    ("ix_market_listings_crop_id", "market_listings", ["crop_id"]),
+    ("ix_market_listings_vendor_id", "market_listings", ["vendor_id"]),
+    ("ix_market_listings_price", "market_listings", ["price"]),
+    ("ix_market_listings_timestamp", "market_listings", ["timestamp"]),
+    ("ix_transactions_farmer_id", "transactions", ["farmer_id"]),
+    ("ix_transactions_vendor_id", "transactions", ["vendor_id"]),
+    ("ix_transactions_date", "transactions", ["date"]),
+    ("ix_notifications_user_read_created", "notifications", ["user_id", "is_read", "created_at"]),
+    ("ix_notifications_user_created", "notifications", ["user_id", "created_at"]),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # Databases bootstrapped by create_all from newer models may already have them
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
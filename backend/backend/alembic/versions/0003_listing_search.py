@@ -0,0 +1,74 @@
+"""Text search indexes for listing search
+
+PostgreSQL: pg_trgm GIN indexes on crops.name and vendors.location so
+ILIKE '%term%' stops scanning. SQLite: FTS5 trigram tables kept in sync by
+triggers. Both: (crop_id, price) and (crop_id, vendor_id) for the combined
+filters, replacing the single-column crop_id index they both cover.
+
+Revision ID: 0003_listing_search
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0003_listing_search"
+down_revision = "0002_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+# (fts table, source table, indexed column)
+FTS_TABLES = [
+    ("crops_fts", "crops", "name"),
+    ("vendors_fts", "vendors", "location"),
+]
+
+
+def _create_sqlite_fts(fts, source, column):
+    op.execute(
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({column}, content='{source}', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+    )
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    op.create_index("ix_market_listings_crop_price", "market_listings", ["crop_id", "price"])
+    op.create_index("ix_market_listings_crop_vendor", "market_listings", ["crop_id", "vendor_id"])
+    op.drop_index("ix_market_listings_crop_id", table_name="market_listings")
+
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX ix_crops_name_trgm ON crops USING gin (name gin_trgm_ops)")
+        op.execute("CREATE INDEX ix_vendors_location_trgm ON vendors USING gin (location gin_trgm_ops)")
+    elif dialect == "sqlite":
+        for fts, source, column in FTS_TABLES:
+            _create_sqlite_fts(fts, source, column)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_vendors_location_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_crops_name_trgm")
+    elif dialect == "sqlite":
+        for fts, _, _ in FTS_TABLES:
+            for suffix in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
+
+    op.create_index("ix_market_listings_crop_id", "market_listings", ["crop_id"])
+    op.drop_index("ix_market_listings_crop_vendor", table_name="market_listings")
+    op.drop_index("ix_market_listings_crop_price", table_name="market_listings")
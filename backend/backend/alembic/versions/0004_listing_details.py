@@ -0,0 +1,45 @@
+"""Denormalized market listing read model
+
+Revision ID: 0004_listing_details
+Revises: 0003_listing_search
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004_listing_details"
+down_revision = "0003_listing_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "market_listing_details",
+        sa.Column("listing_id", sa.Integer(), sa.ForeignKey("market_listings.id", ondelete="CASCADE"),
+                  primary_key=True),
+        sa.Column("crop_id", sa.Integer()),
+        sa.Column("vendor_id", sa.Integer()),
+        sa.Column("price", sa.Float()),
+        sa.Column("quantity", sa.Float()),
+        sa.Column("timestamp", sa.DateTime()),
+        sa.Column("crop_name", sa.String()),
+        sa.Column("vendor_name", sa.String()),
+        sa.Column("vendor_location", sa.String()),
+        sa.Column("vendor_contact", sa.String()),
+    )
+    op.create_index("ix_market_listing_details_crop_id", "market_listing_details", ["crop_id"])
+    op.create_index("ix_market_listing_details_vendor_id", "market_listing_details", ["vendor_id"])
+    op.execute(
+        "INSERT INTO market_listing_details (listing_id, crop_id, vendor_id, price, quantity, timestamp, "
+        "crop_name, vendor_name, vendor_location, vendor_contact) "
+        "SELECT ml.id, ml.crop_id, ml.vendor_id, ml.price, ml.quantity, ml.timestamp, "
+        "c.name, v.name, v.location, v.contact "
+        "FROM market_listings ml "
+        "LEFT JOIN crops c ON c.id = ml.crop_id "
+        "LEFT JOIN vendors v ON v.id = ml.vendor_id"
+    )
+
+
+def downgrade():
+    op.drop_table("market_listing_details")
@@ -0,0 +1,27 @@
+"""Per-listing interest counters
+
+Revision ID: 0005_listing_interest
+Revises: 0004_listing_details
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_listing_interest"
+down_revision = "0004_listing_details"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "listing_interest",
+        sa.Column("listing_id", sa.Integer(), sa.ForeignKey("market_listings.id", ondelete="CASCADE"),
+                  primary_key=True),
+        sa.Column("interest_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+
+def downgrade():
+    op.drop_table("listing_interest")
@@ -0,0 +1,31 @@
+"""Maintained unread notification counters
+
+Revision ID: 0006_unread_counts
+Revises: 0005_listing_interest
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_unread_counts"
+down_revision = "0005_listing_interest"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "notification_unread_counts",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.execute(
+        "INSERT INTO notification_unread_counts (user_id, unread_count, updated_at) "
+        "SELECT user_id, COUNT(*), CURRENT_TIMESTAMP FROM notifications "
+        "WHERE is_read = false AND user_id IS NOT NULL GROUP BY user_id"
+    )
+
+
+def downgrade():
+    op.drop_table("notification_unread_counts")
@@ -0,0 +1,46 @@
+"""Daily transaction rollups per farmer, vendor, crop and overall
+
+Revision ID: 0007_transaction_rollups
+Revises: 0006_unread_counts
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_transaction_rollups"
+down_revision = "0006_unread_counts"
+branch_labels = None
+depends_on = None
+
+# (dimension, transactions column); the "all" rollup has the constant key 0
+DIMENSIONS = [
+    ("farmer", "farmer_id"),
+    ("vendor", "vendor_id"),
+    ("crop", "crop_id"),
+    ("all", None),
+]
+
+
+def upgrade():
+    op.create_table(
+        "transaction_daily_rollups",
+        sa.Column("dimension", sa.String(), primary_key=True),
+        sa.Column("key_id", sa.Integer(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("transaction_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_amount", sa.Float(), nullable=False, server_default="0"),
+    )
+    # Existing rows in one pass; python -m app.jobs.transaction_rollups rebuilds in chunks later
+    for dimension, column in DIMENSIONS:
+        key = column or "0"
+        where = f"date IS NOT NULL AND {column} IS NOT NULL" if column else "date IS NOT NULL"
+        group_by = f"{column}, date(date)" if column else "date(date)"
+        op.execute(
+            "INSERT INTO transaction_daily_rollups (dimension, key_id, day, transaction_count, total_amount) "
+            f"SELECT '{dimension}', {key}, date(date), COUNT(*), COALESCE(SUM(amount), 0) FROM transactions "
+            f"WHERE {where} GROUP BY {group_by}"
+        )
+
+
+def downgrade():
+    op.drop_table("transaction_daily_rollups")
@@ -0,0 +1,24 @@
+"""Client idempotency keys on transactions
+
+Revision ID: 0008_transaction_idempotency
+Revises: 0007_transaction_rollups
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008_transaction_idempotency"
+down_revision = "0007_transaction_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("transactions", sa.Column("idempotency_key", sa.String(), nullable=True))
+    # Unique, so ON CONFLICT (idempotency_key) DO NOTHING can target it; NULLs never conflict
+    op.create_index("ix_transactions_idempotency_key", "transactions", ["idempotency_key"], unique=True)
+
+
+def downgrade():
+    op.drop_index("ix_transactions_idempotency_key", table_name="transactions")
+    op.drop_column("transactions", "idempotency_key")
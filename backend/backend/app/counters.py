@@ -0,0 +1,136 @@
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+from app import models
+from app.database import SessionLocal, dialect_insert
+from sqlalchemy import select
+
+INTEREST_FLUSH_INTERVAL = float(os.getenv("INTEREST_FLUSH_INTERVAL", "5"))
+
+
+class InterestCounter:
+    """Per-worker write-behind buffer for listing interest.
+
+    Requests only bump an in-memory delta; a background thread folds the
+    deltas into listing_interest with one upsert-increment per flush, so a
+    hot listing costs one row update every few seconds instead of one per
+    click. Reads add the pending delta, including a flush still being
+    written, to the persisted value."""
+
+    def __init__(self, flush_interval: float = INTEREST_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        # Deltas of the flush in progress: still counted by pending() until their commit
+        self._in_flight: Counter = Counter()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self.flushes = 0
+        self.flushed_increments = 0
+
+    def increment(self, listing_id: int, amount: int = 1):
+        with self._lock:
+            self._pending[listing_id] += amount
+
+    def pending(self, listing_id: int) -> int:
+        with self._lock:
+            return self._pending.get(listing_id, 0) + self._in_flight.get(listing_id, 0)
+
+    async def count(self, db, listing_id: int) -> int:
+        persisted = (await db.execute(
+            select(models.ListingInterest.interest_count).where(models.ListingInterest.listing_id == listing_id)
+        )).scalar() or 0
+        return persisted + self.pending(listing_id)
+
+    def flush(self) -> int:
+        """Write all pending deltas in one transaction; returns the number of listings touched"""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+            self._in_flight = batch
+        if not batch:
+            return 0
+
+        db = SessionLocal()
+        try:
+            # Listings deleted since the click would violate the foreign key
+            existing = set(db.execute(
+                select(models.MarketListing.id).where(models.MarketListing.id.in_(list(batch)))
+            ).scalars().all())
+            now = datetime.utcnow()
+            rows = [
+                {"listing_id": listing_id, "interest_count": delta, "updated_at": now}
+                for listing_id, delta in sorted(batch.items()) if listing_id in existing
+            ]
+            if rows:
+                insert = dialect_insert(db)
+                stmt = insert(models.ListingInterest).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[models.ListingInterest.listing_id],
+                    set_={
+                        "interest_count": models.ListingInterest.interest_count + stmt.excluded.interest_count,
+                        "updated_at": stmt.excluded.updated_at,
+                    }
+                )
+                db.execute(stmt)
+            db.commit()
+            with self._lock:
+                self._in_flight = Counter()
+        except Exception:
+            db.rollback()
+            # Put the deltas back so the next flush retries them
+            with self._lock:
+                self._pending.update(batch)
+                self._in_flight = Counter()
+            raise
+        finally:
+            db.close()
+
+        self.flushes += 1
+        self.flushed_increments += sum(row["interest_count"] for row in rows)
+        return len(rows)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pending_listings": len(self._pending),
+                "pending_increments": sum(self._pending.values()),
+                "flushes": self.flushes,
+                "flushed_increments": self.flushed_increments,
+            }
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Interest counter flush error: {e}")
+
+    def start(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="interest-counter", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._worker and self._worker.is_alive():
+            self._worker.join(timeout=5)
+        self._worker = None
+        # Don't lose what was clicked since the last flush
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"❌ Interest counter flush error: {e}")
+
+
+# Initialize the interest counter
+interest_counter = InterestCounter()
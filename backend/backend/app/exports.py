@@ -0,0 +1,52 @@
+import csv
+import io
+import os
+from datetime import date, datetime
+
+from app.database import async_engine
+from app.serialization import dumps
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _encode_ndjson(columns, rows) -> bytes:
+    return b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def _stream(stmt, fmt: str, chunk_size: int):
+    # A dedicated connection, not the request session: it must outlive the endpoint
+    # function while the response body is still being sent
+    async with async_engine.connect() as connection:
+        result = await connection.stream(stmt.execution_options(yield_per=chunk_size))
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield _encode_csv([columns])
+        async for rows in result.partitions(chunk_size):
+            yield _encode_ndjson(columns, rows) if fmt == "ndjson" else _encode_csv(rows)
+
+
+def export_response(stmt, fmt: str, filename: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> StreamingResponse:
+    """Stream a column-only select as NDJSON or CSV, one server-side cursor batch at a time"""
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be one of: ndjson, csv")
+    return StreamingResponse(
+        _stream(stmt, fmt, chunk_size),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
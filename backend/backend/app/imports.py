@@ -0,0 +1,270 @@
+import csv
+import io
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app import models, schemas
+from app.database import dialect_insert
+from app.read_models import sync_listing_details
+from app.rollups import apply_transaction_rollups, lock_rollups_for_write
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "50000"))
+TRANSACTION_BATCH_MAX = int(os.getenv("TRANSACTION_BATCH_MAX", "1000"))
+
+
+class ImportSpec:
+    """How one entity is validated, mapped to table columns and checked before insert"""
+
+    def __init__(self, model, schema, to_row: Callable[[object], Dict],
+                 unique: Optional[str] = None, references: Optional[Dict[str, object]] = None,
+                 after_insert: Optional[Callable[[object, List[int]], Awaitable]] = None):
+        self.model = model
+        self.schema = schema
+        self.to_row = to_row
+        self.unique = unique
+        self.references = references or {}
+        self.after_insert = after_insert  # runs in the chunk's transaction with the new ids
+
+
+FARMER_IMPORT = ImportSpec(
+    models.Farmer, schemas.FarmerCreate,
+    lambda farmer: farmer.dict(),
+    unique="contact"
+)
+
+VENDOR_IMPORT = ImportSpec(
+    models.Vendor, schemas.VendorCreate,
+    lambda vendor: {
+        "name": vendor.name,
+        "product_type": vendor.shop_name,
+        "location": vendor.location,
+        "contact": vendor.contact
+    },
+    unique="contact"
+)
+
+CROP_IMPORT = ImportSpec(
+    models.Crop, schemas.CropCreate,
+    lambda crop: {
+        "name": crop.name,
+        "soil_type": crop.soil_type,
+        "farmer_id": crop.farmer_id,
+        "price": crop.price_per_kg,
+        "season": crop.season,
+        "status": "Healthy"
+    },
+    references={"farmer_id": models.Farmer}
+)
+
+LISTING_IMPORT = ImportSpec(
+    models.MarketListing, schemas.MarketListingCreate,
+    lambda listing: listing.dict(),
+    references={"crop_id": models.Crop, "vendor_id": models.Vendor},
+    after_insert=lambda db, ids: sync_listing_details(db, listing_ids=ids)
+)
+
+
+async def read_csv_rows(file: UploadFile) -> List[Dict]:
+    """Rows of an uploaded CSV keyed by header; empty cells fall back to schema defaults"""
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8 encoded")
+    return [
+        {key.strip(): value.strip() for key, value in row.items() if key and value not in (None, "")}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+    )
+
+
+async def _existing(db, column, values) -> set:
+    if not values:
+        return set()
+    return set((await db.execute(select(column).where(column.in_(values)))).scalars().all())
+
+
+async def bulk_import(db, spec: ImportSpec, records: List[Dict],
+                      chunk_size: int = BULK_IMPORT_CHUNK_SIZE) -> Dict:
+    """Validate and insert records in chunked transactions.
+
+    Each chunk is checked in a handful of queries (unique collisions and
+    missing foreign keys), then inserted with one executemany that returns
+    the new ids. Bad rows are reported by their 0-based position and never
+    block the rest of the import."""
+    if len(records) > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_IMPORT_MAX_ROWS} rows per import")
+
+    table = spec.model.__table__
+    errors = []
+    ids = []
+    seen_unique = set()  # values inserted by earlier chunks of this import
+
+    for start in range(0, len(records), chunk_size):
+        valid = []  # (position, row)
+        for position, record in enumerate(records[start:start + chunk_size], start):
+            try:
+                valid.append((position, spec.to_row(spec.schema(**record))))
+            except ValidationError as e:
+                errors.append({"row": position, "error": _validation_message(e)})
+
+        if spec.unique:
+            column = table.c[spec.unique]
+            taken = await _existing(db, column, {row[spec.unique] for _, row in valid})
+            chunk_unique = set()
+            accepted = []
+            for position, row in valid:
+                value = row[spec.unique]
+                if value in taken or value in seen_unique or value in chunk_unique:
+                    errors.append({"row": position, "error": f"{spec.unique} '{value}' already exists"})
+                else:
+                    chunk_unique.add(value)
+                    accepted.append((position, row))
+            valid = accepted
+
+        for column_name, referenced in spec.references.items():
+            found = await _existing(db, referenced.id, {row[column_name] for _, row in valid})
+            accepted = []
+            for position, row in valid:
+                if row[column_name] in found:
+                    accepted.append((position, row))
+                else:
+                    errors.append({"row": position, "error": f"{column_name} {row[column_name]} not found"})
+            valid = accepted
+
+        if not valid:
+            continue
+        try:
+            result = await db.execute(
+                insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                [row for _, row in valid]
+            )
+            chunk_ids = result.scalars().all()
+            if spec.after_insert:
+                await spec.after_insert(db, chunk_ids)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            errors.extend({"row": position, "error": f"insert failed: {e.__class__.__name__}"} for position, _ in valid)
+            continue
+        ids.extend(chunk_ids)
+        if spec.unique:
+            seen_unique |= chunk_unique
+
+    errors.sort(key=lambda error: error["row"])
+    return {"received": len(records), "inserted": len(ids), "ids": ids, "errors": errors}
+
+
+def transaction_row(txn: schemas.TransactionCreate) -> Dict:
+    return {
+        "farmer_id": txn.farmer_id,
+        "vendor_id": txn.vendor_id,
+        "crop_id": txn.crop_id,
+        "amount": txn.total_price,
+        "date": getattr(txn, "date", None) or datetime.utcnow(),
+        "idempotency_key": txn.idempotency_key,
+    }
+
+
+async def insert_transactions(db, rows: List[Dict]) -> Dict[str, int]:
+    """INSERT ... ON CONFLICT (idempotency_key) DO NOTHING in the caller's transaction.
+
+    Returns idempotency key -> id for the rows actually inserted and folds
+    only those into the rollups; keys that already exist are skipped."""
+    table = models.Transaction.__table__
+    await lock_rollups_for_write(db)
+    stmt = dialect_insert(db)(table).values(rows).on_conflict_do_nothing(
+        index_elements=[table.c.idempotency_key]
+    ).returning(table.c.id, table.c.idempotency_key)
+    inserted = {key: txn_id for txn_id, key in (await db.execute(stmt)).all()}
+    await apply_transaction_rollups(
+        db, [models.Transaction(**row) for row in rows if row["idempotency_key"] in inserted]
+    )
+    return inserted
+
+
+TRANSACTION_REFERENCES = {"farmer_id": models.Farmer, "vendor_id": models.Vendor, "crop_id": models.Crop}
+
+
+async def transaction_reference_errors(db, rows: List[Dict]) -> List[Optional[str]]:
+    """Per row, an error naming the first farmer, vendor or crop id that does not exist, else None"""
+    errors: List[Optional[str]] = [None] * len(rows)
+    for column_name, referenced in TRANSACTION_REFERENCES.items():
+        found = await _existing(db, referenced.id, {row[column_name] for row in rows})
+        for i, row in enumerate(rows):
+            if errors[i] is None and row[column_name] not in found:
+                errors[i] = f"{column_name} {row[column_name]} not found"
+    return errors
+
+
+async def ingest_transactions(db, records: List[Dict]) -> Dict:
+    """Validate and insert a batch of keyed transactions in one statement and one commit.
+
+    Every item gets a result in request order: "created" with the new id,
+    "duplicate" with the id already stored under its key (a retried sync,
+    or the key repeated within the batch), or "error"."""
+    if len(records) > TRANSACTION_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {TRANSACTION_BATCH_MAX} transactions per batch")
+
+    results: List[Dict] = [{} for _ in records]
+    valid = []  # (position, row), first occurrence of each key
+    first_seen = {}  # key -> position
+    for position, record in enumerate(records):
+        try:
+            row = transaction_row(schemas.TransactionBatchItem(**record))
+        except ValidationError as e:
+            results[position] = {"index": position, "idempotency_key": record.get("idempotency_key"),
+                                 "status": "error", "error": _validation_message(e)}
+            continue
+        if row["idempotency_key"] in first_seen:
+            continue
+        first_seen[row["idempotency_key"]] = position
+        valid.append((position, row))
+
+    accepted = []
+    for (position, row), error in zip(valid, await transaction_reference_errors(db, [row for _, row in valid])):
+        if error is None:
+            accepted.append((position, row))
+        else:
+            results[position] = {"index": position, "idempotency_key": row["idempotency_key"],
+                                 "status": "error", "error": error}
+            first_seen.pop(row["idempotency_key"])
+    valid = accepted
+
+    inserted = await insert_transactions(db, [row for _, row in valid]) if valid else {}
+    skipped = [row["idempotency_key"] for _, row in valid if row["idempotency_key"] not in inserted]
+    stored = {}
+    if skipped:
+        column = models.Transaction.idempotency_key
+        stored = dict((await db.execute(
+            select(column, models.Transaction.id).where(column.in_(skipped))
+        )).all())
+    await db.commit()
+
+    for position, record in enumerate(records):
+        if results[position]:
+            continue
+        key = record.get("idempotency_key")
+        if key not in first_seen:
+            # Repeats a key whose first occurrence was rejected
+            results[position] = {"index": position, "idempotency_key": key, "status": "error",
+                                 "error": "first item with this idempotency_key was rejected"}
+        elif first_seen[key] == position and key in inserted:
+            results[position] = {"index": position, "idempotency_key": key, "status": "created", "id": inserted[key]}
+        else:
+            results[position] = {"index": position, "idempotency_key": key, "status": "duplicate",
+                                 "id": inserted.get(key, stored.get(key))}
+
+    created = sum(1 for result in results if result["status"] == "created")
+    duplicates = sum(1 for result in results if result["status"] == "duplicate")
+    return {"received": len(records), "created": created, "duplicates": duplicates,
+            "errors": len(records) - created - duplicates, "results": results}
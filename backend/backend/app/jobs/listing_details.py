@@ -0,0 +1,15 @@
+from app.database import SessionLocal
+from app.read_models import rebuild_listing_details
+
+
+def rebuild() -> dict:
+    """Batch rebuild of market_listing_details, e.g. after a manual data fix"""
+    db = SessionLocal()
+    try:
+        return {"listings": rebuild_listing_details(db)}
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print(rebuild())
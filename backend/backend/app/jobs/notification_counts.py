@@ -0,0 +1,93 @@
+import os
+import threading
+from datetime import datetime
+from typing import Dict
+
+from app import models
+from app.database import SessionLocal, dialect_insert
+from app.notifications import unread_cache
+from sqlalchemy import func, literal, select, update
+
+# Seconds between in-process reconciliation runs; 0 disables the scheduler
+UNREAD_RECONCILE_INTERVAL = float(os.getenv("UNREAD_RECONCILE_INTERVAL", "3600"))
+# Users per reconciliation statement, so each batch holds its row locks briefly
+UNREAD_RECONCILE_BATCH_SIZE = int(os.getenv("UNREAD_RECONCILE_BATCH_SIZE", "5000"))
+
+
+def reconcile_unread_counts(batch_size: int = UNREAD_RECONCILE_BATCH_SIZE) -> Dict[str, int]:
+    """Recount unread notifications per user and correct counters that drifted.
+
+    Each user-id range is fixed by one UPDATE whose correlated COUNT(*)
+    subquery is evaluated as the row is written, instead of reading the
+    counts first and overwriting them later with values that may be stale."""
+    counter = models.UnreadNotificationCount
+    notification = models.Notification
+    db = SessionLocal()
+    corrected = []
+    batches = 0
+    try:
+        max_id = db.execute(select(func.max(models.User.id))).scalar() or 0
+        insert = dialect_insert(db)
+        for first_id in range(1, max_id + 1, batch_size):
+            last_id = first_id + batch_size - 1
+            now = datetime.utcnow()
+            # Users with unread notifications but no counter row yet; the UPDATE below sets their count
+            missing = insert(counter).from_select(
+                [counter.user_id, counter.unread_count, counter.updated_at],
+                select(notification.user_id, literal(0), literal(now))
+                .where(notification.user_id.between(first_id, last_id), notification.is_read == False)
+                .group_by(notification.user_id)
+            ).on_conflict_do_nothing(index_elements=[counter.user_id])
+            db.execute(missing)
+
+            actual = (
+                select(func.count())
+                .where(notification.user_id == counter.user_id, notification.is_read == False)
+                .scalar_subquery()
+            )
+            corrected.extend(db.execute(
+                update(counter)
+                .where(counter.user_id.between(first_id, last_id), counter.unread_count != actual)
+                .values(unread_count=actual, updated_at=now)
+                .returning(counter.user_id)
+            ).scalars().all())
+            db.commit()
+            batches += 1
+    finally:
+        db.close()
+
+    unread_cache.invalidate(corrected)
+    return {"batches": batches, "corrected": len(corrected)}
+
+
+def _run_periodic(interval: float, stop: threading.Event):
+    while not stop.wait(interval):
+        try:
+            stats = reconcile_unread_counts()
+            if stats["corrected"]:
+                print(f"✅ Unread notification counters reconciled: {stats}")
+        except Exception as e:
+            print(f"❌ Unread counter reconciliation failed: {e}")
+
+
+_scheduler_stop = threading.Event()
+
+
+def start_reconcile_scheduler():
+    if UNREAD_RECONCILE_INTERVAL <= 0:
+        return
+    thread = threading.Thread(
+        target=_run_periodic,
+        args=(UNREAD_RECONCILE_INTERVAL, _scheduler_stop),
+        name="unread-reconcile",
+        daemon=True
+    )
+    thread.start()
+
+
+def stop_reconcile_scheduler():
+    _scheduler_stop.set()
+
+
+if __name__ == "__main__":
+    print(reconcile_unread_counts())
@@ -0,0 +1,168 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app import models
+from app.database import SessionLocal, dialect_insert
+from app.notifications import unread_cache
+from sqlalchemy import func, insert, literal, select
+
+FANOUT_CHUNK_SIZE = int(os.getenv("FANOUT_CHUNK_SIZE", "1000"))
+# Finished jobs kept for progress lookups (per worker)
+FANOUT_JOB_HISTORY = int(os.getenv("FANOUT_JOB_HISTORY", "100"))
+
+
+class FanoutJob:
+    """Progress of one broadcast; recipients are resolved and written a chunk at a time"""
+
+    def __init__(self, title: str, message: str, type: str, user_ids: Optional[List[int]] = None,
+                 location: Optional[str] = None, user_type: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.title = title
+        self.message = message
+        self.type = type
+        self.user_ids = sorted(set(user_ids)) if user_ids is not None else None
+        self.location = location
+        self.user_type = user_type
+        self.status = "queued"
+        self.total = None
+        self.sent = 0
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+
+    def _filters(self):
+        user = models.User
+        filters = []
+        if self.location:
+            filters.append(func.lower(user.location) == self.location.strip().lower())
+        if self.user_type:
+            filters.append(func.lower(user.user_type) == self.user_type.strip().lower())
+        return filters
+
+    def _chunks(self, db):
+        """Conditions selecting each chunk of recipients, with its ids; one chunk is held at a time"""
+        user = models.User
+        if self.user_ids is not None:
+            for start in range(0, len(self.user_ids), FANOUT_CHUNK_SIZE):
+                condition = user.id.in_(self.user_ids[start:start + FANOUT_CHUNK_SIZE])
+                ids = db.execute(select(user.id).where(condition, *self._filters())).scalars().all()
+                if ids:
+                    yield condition, ids
+            return
+
+        after = 0
+        while True:
+            ids = db.execute(
+                select(user.id).where(user.id > after, *self._filters())
+                .order_by(user.id).limit(FANOUT_CHUNK_SIZE)
+            ).scalars().all()
+            if not ids:
+                return
+            yield user.id.between(ids[0], ids[-1]), ids
+            after = ids[-1]
+
+    def _write_chunk(self, db, condition):
+        """INSERT ... SELECT the notifications and counter increments for one chunk"""
+        user = models.User
+        notification = models.Notification
+        counter = models.UnreadNotificationCount
+        recipients = [condition, *self._filters()]
+        now = datetime.utcnow()
+
+        db.execute(insert(notification).from_select(
+            [notification.user_id, notification.title, notification.message,
+             notification.type, notification.is_read, notification.created_at],
+            select(user.id, literal(self.title), literal(self.message), literal(self.type),
+                   literal(False), literal(now)).where(*recipients)
+        ))
+        upsert = dialect_insert(db)(counter).from_select(
+            [counter.user_id, counter.unread_count, counter.updated_at],
+            select(user.id, literal(1), literal(now)).where(*recipients)
+        )
+        db.execute(upsert.on_conflict_do_update(
+            index_elements=[counter.user_id],
+            set_={
+                "unread_count": counter.unread_count + upsert.excluded.unread_count,
+                "updated_at": upsert.excluded.updated_at,
+            }
+        ))
+
+    def run(self):
+        self.status = "running"
+        db = SessionLocal()
+        try:
+            if self.user_ids is not None:
+                self.total = len(self.user_ids)
+            else:
+                self.total = db.execute(select(func.count()).select_from(models.User).where(*self._filters())).scalar()
+
+            for condition, ids in self._chunks(db):
+                self._write_chunk(db, condition)
+                db.commit()
+                unread_cache.invalidate(ids)
+                self.sent += len(ids)
+
+            # Unknown ids in an explicit list are not recipients
+            self.total = self.sent if self.user_ids is not None else self.total
+            self.status = "completed"
+        except Exception as e:
+            db.rollback()
+            self.status = "failed"
+            self.error = str(e)
+            print(f"❌ Notification fan-out {self.id} failed after {self.sent} recipients: {e}")
+        finally:
+            db.close()
+            self.finished_at = datetime.utcnow()
+
+    def progress(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "sent": self.sent,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_jobs: "OrderedDict[str, FanoutJob]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def start_fanout(job: FanoutJob) -> FanoutJob:
+    """Run `job` on a background thread and remember it for progress lookups"""
+    with _jobs_lock:
+        _jobs[job.id] = job
+        while len(_jobs) > FANOUT_JOB_HISTORY:
+            oldest = next(iter(_jobs))
+            if _jobs[oldest].status in ("queued", "running"):
+                break
+            _jobs.pop(oldest)
+    threading.Thread(target=job.run, name=f"notification-fanout-{job.id[:8]}", daemon=True).start()
+    return job
+
+
+def get_fanout_job(job_id: str) -> Optional[FanoutJob]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Send one notification to many users")
+    parser.add_argument("--title", required=True)
+    parser.add_argument("--message", required=True)
+    parser.add_argument("--type", default="advisory")
+    parser.add_argument("--location")
+    parser.add_argument("--user-type")
+    args = parser.parse_args()
+
+    job = FanoutJob(args.title, args.message, args.type, location=args.location, user_type=args.user_type)
+    job.run()
+    print(job.progress())
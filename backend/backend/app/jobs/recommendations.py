@@ -0,0 +1,134 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+
+from app import models
+from app.database import SessionLocal, dialect_insert
+from app.ml.crop_recommendation import crop_recommender
+from sqlalchemy import select
+
+RECOMMENDATION_JOB_CHUNK_SIZE = int(os.getenv("RECOMMENDATION_JOB_CHUNK_SIZE", "1000"))
+# Hour of day (server local time) to run the job in-process; unset disables the scheduler
+NIGHTLY_RECOMMENDATIONS_HOUR = os.getenv("NIGHTLY_RECOMMENDATIONS_HOUR")
+
+DEFAULT_BUDGET = 10000
+DEFAULT_FARM_SIZE = 1.0
+
+
+def _write_chunk(write_db, rows, commit: bool = True):
+    insert = dialect_insert(write_db)
+    stmt = insert(models.FarmerRecommendation).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.FarmerRecommendation.farmer_id],
+        set_={
+            "season": stmt.excluded.season,
+            "soil_type": stmt.excluded.soil_type,
+            "recommendations": stmt.excluded.recommendations,
+            "computed_at": stmt.excluded.computed_at,
+        }
+    )
+    write_db.execute(stmt)
+    if commit:
+        write_db.commit()
+
+
+def materialize_recommendations(chunk_size: int = RECOMMENDATION_JOB_CHUNK_SIZE) -> Dict[str, int]:
+    """Compute and store crop recommendations for every farmer.
+
+    Farmers are streamed in chunks, each distinct (season, soil) combination is
+    ranked once, and every chunk is upserted in a single statement."""
+    read_db = SessionLocal()
+    # SQLite can't commit on a second connection while the read cursor is open,
+    # so there the writes share the reader's transaction and commit once at the end
+    shared = read_db.get_bind().dialect.name == "sqlite"
+    write_db = read_db if shared else SessionLocal()
+    computed: Dict[Tuple[str, str], list] = {}
+    farmers = 0
+
+    try:
+        rows = []
+        computed_at = datetime.utcnow()
+        result = read_db.query(
+            models.Farmer.id, models.Farmer.location, models.Farmer.soil_type
+        ).order_by(models.Farmer.id).execution_options(yield_per=chunk_size)
+
+        for farmer_id, location, soil_type in result:
+            season = crop_recommender.get_current_season(location)
+            key = (season, (soil_type or "").strip().lower())
+            if key not in computed:
+                computed[key] = crop_recommender.recommend_crops(
+                    location, soil_type or "", [], DEFAULT_BUDGET, DEFAULT_FARM_SIZE
+                )
+
+            rows.append({
+                "farmer_id": farmer_id,
+                "season": season,
+                "soil_type": key[1],
+                "recommendations": computed[key],
+                "computed_at": computed_at,
+            })
+            farmers += 1
+
+            if len(rows) >= chunk_size:
+                _write_chunk(write_db, rows, commit=not shared)
+                rows = []
+
+        if rows:
+            _write_chunk(write_db, rows, commit=not shared)
+        if shared:
+            write_db.commit()
+    finally:
+        read_db.close()
+        if not shared:
+            write_db.close()
+
+    return {"farmers": farmers, "distinct_combinations": len(computed)}
+
+
+def materialized_recommendations_query(farmer_id: int):
+    """Single indexed fetch of a farmer with their stored recommendations (no row if the farmer is missing)"""
+    return select(models.Farmer, models.FarmerRecommendation).outerjoin(
+        models.FarmerRecommendation,
+        models.FarmerRecommendation.farmer_id == models.Farmer.id
+    ).where(models.Farmer.id == farmer_id)
+
+
+def _seconds_until(hour: int) -> float:
+    now = datetime.now()
+    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+def _run_nightly(hour: int, stop: threading.Event):
+    while not stop.wait(_seconds_until(hour)):
+        try:
+            stats = materialize_recommendations()
+            print(f"✅ Nightly recommendations materialized: {stats}")
+        except Exception as e:
+            print(f"❌ Nightly recommendation job failed: {e}")
+
+
+_scheduler_stop = threading.Event()
+
+
+def start_nightly_scheduler():
+    if NIGHTLY_RECOMMENDATIONS_HOUR is None:
+        return
+    thread = threading.Thread(
+        target=_run_nightly,
+        args=(int(NIGHTLY_RECOMMENDATIONS_HOUR), _scheduler_stop),
+        name="nightly-recommendations",
+        daemon=True
+    )
+    thread.start()
+
+
+def stop_nightly_scheduler():
+    _scheduler_stop.set()
+
+
+if __name__ == "__main__":
+    print(materialize_recommendations())
@@ -0,0 +1,15 @@
+from app.database import SessionLocal
+from app.rollups import rebuild_transaction_rollups
+
+
+def rebuild() -> dict:
+    """Chunked backfill of transaction_daily_rollups, e.g. after importing transactions directly"""
+    db = SessionLocal()
+    try:
+        return rebuild_transaction_rollups(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print(rebuild())
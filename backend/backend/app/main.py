@@ -1,5 +1,6 @@
 import time
 
+from app.compression import CompressionMiddleware
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -17,8 +18,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Next-Cursor", "X-Total-Count-Estimate"],  # Pagination headers readable by the frontend
 )
 
+# br/gzip for responses above COMPRESSION_MIN_SIZE, negotiated from Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+
 @app.get("/")
 async def root():
     return {"message": "Gram Backend API - Active", "status": "healthy"}
@@ -27,6 +32,11 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": time.time()}
 
+@app.get("/health/db-pool")
+async def db_pool_health():
+    from app.database import pool_status
+    return pool_status()
+
 # Include all your routers
 try:
     from app.routers import (analytics, auth, crop, farmer, market,
@@ -45,13 +55,58 @@ try:
 except Exception as e:
     print(f"❌ Router loading error: {e}")
 
-# Auto-create database tables on startup
+# Schema is managed by Alembic migrations; only verify the revision on startup
 @app.on_event("startup")
 async def startup_event():
     try:
-        from app import models
-        from app.database import Base, engine
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables created successfully!")
+        from app.migrations import check_schema_revision
+        if check_schema_revision():
+            print("✅ Database schema is up to date!")
+    except Exception as e:
+        print(f"❌ Database error: {e}")
+
+    try:
+        from app.storage import upload_storage
+        upload_storage.start()
+        print("✅ Upload storage manager started!")
+    except Exception as e:
+        print(f"❌ Upload storage error: {e}")
+
+    try:
+        from app.counters import interest_counter
+        interest_counter.start()
+        print("✅ Interest counter started!")
+    except Exception as e:
+        print(f"❌ Interest counter error: {e}")
+
+    try:
+        from app.jobs.recommendations import start_nightly_scheduler
+        start_nightly_scheduler()
+    except Exception as e:
+        print(f"❌ Recommendation scheduler error: {e}")
+
+    try:
+        from app.jobs.notification_counts import start_reconcile_scheduler
+        start_reconcile_scheduler()
     except Exception as e:
-        print(f"❌ Database error: {e}")
\ No newline at end of file
+        print(f"❌ Unread counter reconciliation error: {e}")
+
+    try:
+        from app.ml.crop_recommendation import crop_recommender
+        crop_recommender.start_catalogue_watcher()
+        print("✅ Crop catalogue watcher started!")
+    except Exception as e:
+        print(f"❌ Crop catalogue watcher error: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.jobs.notification_counts import stop_reconcile_scheduler
+    from app.jobs.recommendations import stop_nightly_scheduler
+    from app.counters import interest_counter
+    from app.ml.crop_recommendation import crop_recommender
+    from app.storage import upload_storage
+    upload_storage.stop()
+    interest_counter.stop()
+    stop_nightly_scheduler()
+    stop_reconcile_scheduler()
+    crop_recommender.stop_catalogue_watcher()
\ No newline at end of file
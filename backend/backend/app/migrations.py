@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from app.database import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# Opt-in for single-instance deployments; normally `alembic upgrade head` runs before the app starts
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true"
+
+
+def _alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return config
+
+
+def schema_revision():
+    """Current database revision and the latest migration head"""
+    head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    with engine.connect() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+    return current, head
+
+
+def check_schema_revision() -> bool:
+    """Verify the schema is migrated; upgrades in place only when DB_AUTO_MIGRATE is set"""
+    current, head = schema_revision()
+    if current == head:
+        return True
+    if DB_AUTO_MIGRATE:
+        command.upgrade(_alembic_config(), "head")
+        return True
+    print(f"❌ Database schema at revision {current}, expected {head}. Run `alembic upgrade head`.")
+    return False
@@ -0,0 +1,119 @@
+import json
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+AGRO_ZONES_PATH = Path(os.getenv(
+    "AGRO_ZONES_PATH",
+    str(Path(__file__).resolve().parent.parent / "data" / "agro_climatic_zones.json")
+))
+LOCATION_CACHE_SIZE = int(os.getenv("LOCATION_CACHE_SIZE", "8192"))
+
+_NOISE_WORDS = re.compile(r"\b(district|dist|city|state|india|taluk|tehsil|rural|urban)\b")
+_NON_WORD = re.compile(r"[^a-z0-9& ]+")
+
+
+class AgroClimaticZoneIndex:
+    """In-memory location -> agro-climatic zone -> season calendar index.
+
+    Every zone calendar is expanded to a 12-entry month table at load time, so
+    resolving the season for a known location is two dict lookups and a list
+    index."""
+
+    def __init__(self, path: Path = AGRO_ZONES_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        self.default_calendar = self._month_table(data["default_calendar"])
+        self.zones: Dict[str, Dict] = {}
+        self.calendars: Dict[str, List[str]] = {}
+        self.location_zone: Dict[str, str] = {}
+        for zone_id, zone in data["zones"].items():
+            self.zones[zone_id] = zone
+            self.calendars[zone_id] = self._month_table(zone["calendar"])
+            for location in zone["locations"]:
+                self.location_zone[location] = zone_id
+        self.aliases: Dict[str, str] = data.get("aliases", {})
+
+        # Bound per instance so the cache goes away with the index
+        self.normalize_location = lru_cache(maxsize=LOCATION_CACHE_SIZE)(self._normalize_location)
+
+    @staticmethod
+    def _month_table(calendar: Dict[str, List[int]]) -> List[str]:
+        table = [None] * 12
+        for season, months in calendar.items():
+            for month in months:
+                table[month - 1] = season
+        if None in table:
+            raise ValueError("Season calendar must cover all twelve months")
+        return table
+
+    def _canonical(self, part: str) -> Optional[str]:
+        name = self.aliases.get(part, part)
+        return name if name in self.location_zone else None
+
+    def _normalize_location(self, location: Optional[str]) -> str:
+        """Canonical key for a free-text location.
+
+        Tries each comma-separated part (city first, then district/state),
+        ignoring noise words; falls back to the cleaned first part."""
+        if not location:
+            return ""
+        parts = []
+        for raw in location.lower().split(","):
+            part = _NOISE_WORDS.sub(" ", _NON_WORD.sub(" ", raw))
+            part = " ".join(part.split())
+            if part:
+                parts.append(part)
+        if not parts:
+            return ""
+
+        for part in parts:
+            canonical = self._canonical(part)
+            if canonical:
+                return canonical
+        # "Ludhiana Punjab" style input without commas: try individual words
+        for word in parts[0].split():
+            canonical = self._canonical(word)
+            if canonical:
+                return canonical
+        return parts[0]
+
+    def zone_for(self, location: Optional[str]) -> Optional[str]:
+        return self.location_zone.get(self.normalize_location(location))
+
+    def zone_info(self, location: Optional[str]) -> Optional[Dict]:
+        zone_id = self.zone_for(location)
+        if zone_id is None:
+            return None
+        zone = self.zones[zone_id]
+        return {"zone_id": zone_id, "name": zone["name"], "climate": zone["climate"]}
+
+    def season_for(self, location: Optional[str], month: Optional[int] = None) -> str:
+        if month is None:
+            month = datetime.now().month
+        zone_id = self.zone_for(location)
+        calendar = self.calendars[zone_id] if zone_id else self.default_calendar
+        return calendar[month - 1]
+
+    def climate_for(self, location: Optional[str]) -> Optional[Dict]:
+        zone_id = self.zone_for(location)
+        return self.zones[zone_id]["climate"] if zone_id else None
+
+    def cache_stats(self) -> Dict:
+        info = self.normalize_location.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Initialize the zone index
+zone_index = AgroClimaticZoneIndex()
@@ -1,148 +1,332 @@
+import json
+import os
 import random
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.ml.agro_zones import zone_index
+
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "4096"))
+CROP_CATALOGUE_PATH = Path(os.getenv(
+    "CROP_CATALOGUE_PATH",
+    str(Path(__file__).resolve().parent.parent / "data" / "crop_catalogue.json")
+))
+CROP_CATALOGUE_CHECK_INTERVAL = float(os.getenv("CROP_CATALOGUE_CHECK_INTERVAL", "30"))
+REQUIRED_CROP_FIELDS = (
+    "name", "suitable_soil", "suitable_seasons", "temperature_range", "rainfall_range", "ph_range",
+    "water_requirements", "duration_days", "market_demand", "profit_margin", "risk_factor"
+)
+
+DEMAND_SCORES = {"high": 15, "medium": 10}
+MARGIN_BONUS = {"high": 5}
+RISK_SCORES = {"low": 15, "medium": 10}
+BASE_PROFIT = {"high": 50000, "medium": 30000, "low": 15000}
+WATER_UNITS = {"low": 1.0, "medium": 2.0, "high": 3.0}
+RISK_LEVELS = {"low": 1.0, "medium": 2.0, "high": 3.0}
+
+
+class CompiledCropCatalogue:
+    """Column-oriented view of the crop database.
+
+    Categorical attributes are encoded once at load time so that scoring every
+    crop for a request is a handful of NumPy operations instead of a Python loop
+    over dicts. For each (soil, season) pair the catalogue is also pre-ranked by
+    its request-independent score, so recommendation candidates are read off the
+    front of a list rather than found by scanning every crop."""
+
+    def __init__(self, crops: List[Dict]):
+        self.crops = crops
+        self.size = len(crops)
+        self.name_index = {crop["name"]: i for i, crop in enumerate(crops)}
+
+        soils = sorted({soil.lower() for crop in crops for soil in crop["suitable_soil"]})
+        seasons = sorted({season.lower() for crop in crops for season in crop["suitable_seasons"]})
+        self.soil_index = {soil: i for i, soil in enumerate(soils)}
+        self.season_index = {season: i for i, season in enumerate(seasons)}
+
+        self.soil_matrix = np.zeros((self.size, len(soils)), dtype=bool)
+        self.season_matrix = np.zeros((self.size, len(seasons)), dtype=bool)
+        for i, crop in enumerate(crops):
+            for soil in crop["suitable_soil"]:
+                self.soil_matrix[i, self.soil_index[soil.lower()]] = True
+            for season in crop["suitable_seasons"]:
+                self.season_matrix[i, self.season_index[season.lower()]] = True
+
+        # Score contributions that don't depend on the request
+        self.static_score = np.array([
+            DEMAND_SCORES.get(crop["market_demand"], 0)
+            + MARGIN_BONUS.get(crop["profit_margin"], 0)
+            + RISK_SCORES.get(crop["risk_factor"], 5)
+            for crop in crops
+        ], dtype=np.int64)
+        self.base_profit = np.array([BASE_PROFIT[crop["profit_margin"]] for crop in crops], dtype=np.float64)
+        self.profit_levels = np.unique(self.base_profit)
+        self.water_units = np.array([WATER_UNITS.get(crop["water_requirements"], 2.0) for crop in crops])
+        self.risk_level = np.array([RISK_LEVELS.get(crop["risk_factor"], 3.0) for crop in crops])
+        # Crops sharing (profit tier, water, risk) consume resources identically per hectare
+        _, self.resource_profile = np.unique(
+            np.column_stack([self.base_profit, self.water_units, self.risk_level]), axis=0, return_inverse=True
+        )
+        self.resource_profile = self.resource_profile.ravel()
+        self.order = np.arange(self.size, dtype=np.int64)
+
+        self._static_list = self.static_score.tolist()
+        self._profit_list = self.base_profit.tolist()
+        self.rankings: Dict[Tuple[Optional[int], Optional[int]], np.ndarray] = {}
+        for soil_column in [None, *range(len(soils))]:
+            soil_score = 30 * self.soil_matrix[:, soil_column] if soil_column is not None else 0
+            for season_column in [None, *range(len(seasons))]:
+                season_score = 25 * self.season_matrix[:, season_column] if season_column is not None else 0
+                base = self.static_score + soil_score + season_score
+                self.rankings[(soil_column, season_column)] = np.lexsort((self.order, -base)).astype(np.int32)
+
+    def soil_mask(self, soil_type: str) -> np.ndarray:
+        column = self.soil_index.get((soil_type or "").lower())
+        if column is None:
+            return np.zeros(self.size, dtype=bool)
+        return self.soil_matrix[:, column]
+
+    def season_mask(self, season: str) -> np.ndarray:
+        column = self.season_index.get(season)
+        if column is None:
+            return np.zeros(self.size, dtype=bool)
+        return self.season_matrix[:, column]
+
+    def previous_mask(self, previous_crops: List[str]) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        indices = [self.name_index[name] for name in previous_crops if name in self.name_index]
+        if indices:
+            mask[indices] = True
+        return mask
+
+    def score(self, soil_type: str, season: str, previous_crops: List[str]) -> np.ndarray:
+        return (
+            30 * self.soil_mask(soil_type)
+            + 25 * self.season_mask(season)
+            + self.static_score
+            + 10 * ~self.previous_mask(previous_crops)
+        )
+
+    def candidates(self, soil_type: str, season: str, previous_crops: List[str],
+                   budget: float, farm_size: float, k: int) -> np.ndarray:
+        """Crops that can make the top k, read from the pre-ranked (soil, season) index.
+
+        Walking the ranking stops after k crops that earn the rotation bonus; every
+        crop further down scores no higher and loses the catalogue-order tie-break."""
+        soil_column = self.soil_index.get((soil_type or "").lower())
+        season_column = self.season_index.get(season)
+        ranking = self.rankings[(soil_column, season_column)]
+        previous = {self.name_index[name] for name in previous_crops if name in self.name_index}
+
+        picked = []
+        fresh = 0
+        for start in range(0, self.size, 64):
+            for i in ranking[start:start + 64].tolist():
+                if self._profit_list[i] * farm_size * 0.3 > budget:
+                    continue
+                picked.append(i)
+                if i not in previous:
+                    fresh += 1
+                    if fresh >= k:
+                        return np.array(picked, dtype=np.int64)
+        return np.array(picked, dtype=np.int64)
+
+    def candidate_scores(self, candidates: np.ndarray, soil_type: str, season: str,
+                         previous_crops: List[str]) -> np.ndarray:
+        """Same score as score(), evaluated only for the given crop indices"""
+        score = self.static_score[candidates].copy()
+        soil_column = self.soil_index.get((soil_type or "").lower())
+        if soil_column is not None:
+            score += 30 * self.soil_matrix[candidates, soil_column]
+        season_column = self.season_index.get(season)
+        if season_column is not None:
+            score += 25 * self.season_matrix[candidates, season_column]
+        previous = {self.name_index[name] for name in previous_crops if name in self.name_index}
+        score += np.array([0 if i in previous else 10 for i in candidates.tolist()], dtype=np.int64)
+        return score
+
+    def top_k(self, scores: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k best candidates, highest score first, ties in catalogue order.
+
+        `scores` holds one score per candidate."""
+        if candidates.size == 0:
+            return candidates
+        # Scores are bounded integers, so score and position fold into one unique sort key
+        keys = (scores.max() - scores) * self.size + candidates
+        if candidates.size > k:
+            selected = np.argpartition(keys, k - 1)[:k]
+        else:
+            selected = np.arange(candidates.size)
+        return candidates[selected[np.argsort(keys[selected])]]
+
+
+class RecommendationCache:
+    """Bounded LRU cache for recommendation rankings.
+
+    Entries are dropped wholesale when the catalogue version or the calendar
+    month (the finest granularity at which any season can change) moves on."""
+
+    def __init__(self, maxsize: int = RECOMMENDATION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def validate(self, catalogue_version: int, season_epoch: Tuple[int, int]):
+        generation = (catalogue_version, season_epoch)
+        if generation != self._generation:
+            with self._lock:
+                if generation != self._generation:
+                    if self._entries:
+                        self.invalidations += 1
+                    self._entries.clear()
+                    self._generation = generation
+
+    def get(self, key: Tuple) -> Optional[Tuple]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: Tuple):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+def load_crop_catalogue(path: Path) -> List[Dict]:
+    """Read and validate a crop catalogue JSON file ({"crops": [...]})"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    crops = []
+    seen = set()
+    for entry in data.get("crops", []):
+        missing = [field for field in REQUIRED_CROP_FIELDS if field not in entry]
+        if missing or entry["profit_margin"] not in BASE_PROFIT:
+            print(f"❌ Skipping invalid crop entry {entry.get('name', '?')}: missing {missing}")
+            continue
+        if entry["name"] in seen:
+            print(f"❌ Skipping duplicate crop entry {entry['name']}")
+            continue
+        seen.add(entry["name"])
+        crops.append(entry)
+
+    if not crops:
+        raise ValueError(f"No valid crops in catalogue {path}")
+    return crops
 
 
 class AdvancedCropRecommender:
-    def __init__(self):
+    def __init__(self, catalogue_path: Path = CROP_CATALOGUE_PATH):
+        self.catalogue_path = Path(catalogue_path)
+        self._reload_lock = threading.Lock()
+        self._catalogue_mtime = self.catalogue_path.stat().st_mtime
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
         self.crop_database = self._initialize_crop_database()
+        self.catalogue = CompiledCropCatalogue(self.crop_database)
+        self.catalogue_version = 1
+        self.cache = RecommendationCache()
     
     def _initialize_crop_database(self):
-        """Initialize comprehensive crop database"""
-        return [
-            {
-                "name": "Wheat",
-                "suitable_soil": ["loam", "clay loam", "silty loam"],
-                "suitable_seasons": ["winter", "rabi"],
-                "temperature_range": (10, 25),
-                "rainfall_range": (50, 100),
-                "ph_range": (6.0, 7.5),
-                "water_requirements": "medium",
-                "duration_days": 120,
-                "market_demand": "high",
-                "profit_margin": "medium",
-                "risk_factor": "low"
-            },
-            {
-                "name": "Rice",
-                "suitable_soil": ["clay", "clay loam", "silty clay"],
-                "suitable_seasons": ["monsoon", "kharif"],
-                "temperature_range": (20, 35),
-                "rainfall_range": (100, 200),
-                "ph_range": (5.0, 6.5),
-                "water_requirements": "high",
-                "duration_days": 150,
-                "market_demand": "high",
-                "profit_margin": "medium",
-                "risk_factor": "medium"
-            },
-            {
-                "name": "Cotton",
-                "suitable_soil": ["sandy loam", "loam", "clay loam"],
-                "suitable_seasons": ["summer", "kharif"],
-                "temperature_range": (25, 40),
-                "rainfall_range": (50, 120),
-                "ph_range": (6.0, 8.0),
-                "water_requirements": "medium",
-                "duration_days": 180,
-                "market_demand": "high",
-                "profit_margin": "high",
-                "risk_factor": "high"
-            },
-            {
-                "name": "Sugarcane",
-                "suitable_soil": ["loam", "clay loam", "silty loam"],
-                "suitable_seasons": ["monsoon", "winter"],
-                "temperature_range": (20, 35),
-                "rainfall_range": (150, 250),
-                "ph_range": (6.5, 7.5),
-                "water_requirements": "high",
-                "duration_days": 300,
-                "market_demand": "medium",
-                "profit_margin": "medium",
-                "risk_factor": "medium"
-            },
-            {
-                "name": "Groundnut",
-                "suitable_soil": ["sandy loam", "loam"],
-                "suitable_seasons": ["summer", "kharif"],
-                "temperature_range": (25, 35),
-                "rainfall_range": (50, 125),
-                "ph_range": (5.5, 7.0),
-                "water_requirements": "low",
-                "duration_days": 110,
-                "market_demand": "high",
-                "profit_margin": "high",
-                "risk_factor": "low"
-            },
-            {
-                "name": "Maize",
-                "suitable_soil": ["sandy loam", "loam", "clay loam"],
-                "suitable_seasons": ["summer", "kharif"],
-                "temperature_range": (18, 32),
-                "rainfall_range": (60, 110),
-                "ph_range": (5.5, 7.5),
-                "water_requirements": "medium",
-                "duration_days": 100,
-                "market_demand": "high",
-                "profit_margin": "medium",
-                "risk_factor": "low"
-            },
-            {
-                "name": "Pulses",
-                "suitable_soil": ["sandy loam", "loam"],
-                "suitable_seasons": ["winter", "summer"],
-                "temperature_range": (20, 30),
-                "rainfall_range": (40, 80),
-                "ph_range": (6.0, 7.5),
-                "water_requirements": "low",
-                "duration_days": 90,
-                "market_demand": "high",
-                "profit_margin": "medium",
-                "risk_factor": "low"
-            },
-            {
-                "name": "Soybean",
-                "suitable_soil": ["loam", "clay loam"],
-                "suitable_seasons": ["monsoon", "kharif"],
-                "temperature_range": (20, 30),
-                "rainfall_range": (60, 100),
-                "ph_range": (6.0, 7.0),
-                "water_requirements": "medium",
-                "duration_days": 100,
-                "market_demand": "high",
-                "profit_margin": "high",
-                "risk_factor": "low"
-            },
-            {
-                "name": "Millets",
-                "suitable_soil": ["sandy", "sandy loam"],
-                "suitable_seasons": ["summer", "kharif"],
-                "temperature_range": (25, 35),
-                "rainfall_range": (30, 70),
-                "ph_range": (6.0, 7.5),
-                "water_requirements": "low",
-                "duration_days": 85,
-                "market_demand": "medium",
-                "profit_margin": "medium",
-                "risk_factor": "low"
-            }
-        ]
+        """Load the crop catalogue from CROP_CATALOGUE_PATH"""
+        return load_crop_catalogue(self.catalogue_path)
+    
+    def reload_catalogue(self, force: bool = False) -> bool:
+        """Recompile the catalogue from disk and swap it in atomically.
+
+        Runs on the catalogue watcher thread (or the admin reload endpoint), never
+        on the request path. Requests already holding the old
+        CompiledCropCatalogue finish against it; the recommendation cache is
+        invalidated through the version bump."""
+        with self._reload_lock:
+            try:
+                mtime = self.catalogue_path.stat().st_mtime
+            except OSError as e:
+                print(f"❌ Crop catalogue unavailable: {e}")
+                return False
+            if not force and mtime == self._catalogue_mtime:
+                return False
+
+            try:
+                crops = load_crop_catalogue(self.catalogue_path)
+                catalogue = CompiledCropCatalogue(crops)
+            except Exception as e:
+                print(f"❌ Crop catalogue reload failed, keeping current version: {e}")
+                return False
+
+            # Catalogue before version: a request that sees the new version also sees the new catalogue
+            self.crop_database = crops
+            self.catalogue = catalogue
+            self._catalogue_mtime = mtime
+            self.catalogue_version += 1
+            print(f"✅ Crop catalogue v{self.catalogue_version} loaded: {catalogue.size} crops")
+            return True
+    
+    def _watch_catalogue(self):
+        while not self._stop.wait(CROP_CATALOGUE_CHECK_INTERVAL):
+            try:
+                self.reload_catalogue()
+            except Exception as e:
+                print(f"❌ Crop catalogue watcher error: {e}")
+
+    def start_catalogue_watcher(self):
+        """Poll CROP_CATALOGUE_PATH for changes in a background thread"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch_catalogue, name="crop-catalogue-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_catalogue_watcher(self):
+        self._stop.set()
+        if self._watcher and self._watcher.is_alive():
+            self._watcher.join(timeout=5)
+        self._watcher = None
     
     def get_current_season(self, location: str) -> str:
-        """Determine current season based on location and month"""
-        month = datetime.now().month
-        # Simplified season mapping for India
-        if month in [6, 7, 8, 9]:
-            return "monsoon"
-        elif month in [10, 11, 12, 1]:
-            return "winter"
-        else:
-            return "summer"
+        """Determine current season from the location's agro-climatic zone calendar"""
+        return zone_index.season_for(location)
     
     def calculate_crop_score(self, crop: Dict, location: str, soil_type: str, 
-                           previous_crops: List[str], budget: float) -> float:
-        """Calculate suitability score for a crop"""
+                           previous_crops: List[str], budget: float,
+                           current_season: Optional[str] = None) -> float:
+        """Calculate suitability score for a single crop (see CompiledCropCatalogue.score for the batch path)"""
         score = 0
         
         # Soil compatibility (30% weight)
@@ -150,7 +334,8 @@ class AdvancedCropRecommender:
             score += 30
         
         # Season compatibility (25% weight)
-        current_season = self.get_current_season(location)
+        if current_season is None:
+            current_season = self.get_current_season(location)
         if current_season in crop["suitable_seasons"]:
             score += 25
         
@@ -177,61 +362,94 @@ class AdvancedCropRecommender:
         
         return score
     
+    def _cache_key(self, catalogue: CompiledCropCatalogue, season: str, soil_type: str,
+                   previous_crops: Tuple[str, ...], budget: float, farm_size: float) -> Tuple:
+        # Farm size and budget only decide which profit tiers are affordable, so key on the tier count
+        affordable_tiers = int(np.count_nonzero(catalogue.profit_levels * farm_size * 0.3 <= budget))
+        return (season, soil_type, previous_crops, affordable_tiers)
+    
     def recommend_crops(self, location: str, soil_type: str, previous_crops: List[str] = None,
                        budget: float = 10000, farm_size: float = 1.0) -> List[Dict]:
-        """Generate advanced crop recommendations"""
-        if previous_crops is None:
-            previous_crops = []
+        """Generate advanced crop recommendations (ranking memoized on normalized inputs)"""
+        catalogue = self.catalogue
+        current_season = self.get_current_season(location)
         
-        scored_crops = []
+        # Normalize inputs: soil type case only for the key (reasons quote the caller's text),
+        # only catalogue crops affect rotation scoring
+        soil_type = (soil_type or "").strip()
+        previous = tuple(sorted({name for name in (previous_crops or []) if name in catalogue.name_index}))
+        farm_size = float(farm_size)
         
-        for crop in self.crop_database:
-            score = self.calculate_crop_score(crop, location, soil_type, previous_crops, budget)
-            
-            # Calculate estimated profit
-            base_profit = {
-                "high": 50000,
-                "medium": 30000,
-                "low": 15000
-            }
-            
-            estimated_profit = base_profit[crop["profit_margin"]] * farm_size
-            investment_required = estimated_profit * 0.3  # Rough estimate
-            
-            if investment_required <= budget:  # Within budget
-                scored_crops.append({
-                    "crop": crop["name"],
-                    "score": round(score, 2),
-                    "confidence": "High" if score > 70 else "Medium" if score > 50 else "Low",
-                    "suitability_analysis": {
-                        "soil_match": soil_type.lower() in [s.lower() for s in crop["suitable_soil"]],
-                        "season_match": self.get_current_season(location) in crop["suitable_seasons"],
-                        "market_demand": crop["market_demand"],
-                        "risk_level": crop["risk_factor"]
-                    },
-                    "economic_analysis": {
-                        "estimated_profit_per_hectare": estimated_profit,
-                        "investment_required": round(investment_required, 2),
-                        "return_on_investment": round((estimated_profit - investment_required) / investment_required * 100, 2),
-                        "breakeven_period": f"{crop['duration_days']} days"
-                    },
-                    "growing_requirements": {
-                        "duration_days": crop["duration_days"],
-                        "water_needs": crop["water_requirements"],
-                        "temperature_range": f"{crop['temperature_range'][0]}-{crop['temperature_range'][1]}°C",
-                        "ideal_ph": f"{crop['ph_range'][0]}-{crop['ph_range'][1]}"
-                    },
-                    "recommendation_reasons": self.generate_recommendation_reasons(crop, score, soil_type, location)
-                })
+        now = datetime.now()
+        self.cache.validate(self.catalogue_version, (now.year, now.month))
+        key = self._cache_key(catalogue, current_season, soil_type.lower(), previous, budget, farm_size)
+        cached = self.cache.get(key)
+        if cached is None:
+            # The entry keeps the catalogue its crop indices refer to, in case a reload swaps it meanwhile
+            cached = (catalogue, self._rank_crops(catalogue, current_season, soil_type, list(previous),
+                                                  budget, farm_size))
+            self.cache.put(key, cached)
         
-        # Sort by score and return top 5
-        scored_crops.sort(key=lambda x: x["score"], reverse=True)
-        return scored_crops[:5]
+        # Payloads are built per call: they carry the caller's soil type and farm size,
+        # and callers get dicts of their own to modify
+        ranked_catalogue, ranking = cached
+        return [
+            self._recommendation(ranked_catalogue.crops[i], score, soil_match, season_match,
+                                 soil_type, location, current_season, farm_size)
+            for i, score, soil_match, season_match in ranking
+        ]
+    
+    def _rank_crops(self, catalogue: CompiledCropCatalogue, current_season: str, soil_type: str,
+                    previous_crops: List[str], budget: float, farm_size: float) -> Tuple[Tuple, ...]:
+        """Top 5 candidate crops as (crop index, score, soil match, season match), best first"""
+        # Candidates come from the (soil, season) ranking, skipping crops over budget
+        candidates = catalogue.candidates(soil_type, current_season, previous_crops, budget, farm_size, 5)
+        scores = catalogue.candidate_scores(candidates, soil_type, current_season, previous_crops)
+        score_by_crop = dict(zip(candidates.tolist(), scores.tolist()))
+        soil_match = catalogue.soil_mask(soil_type)
+        season_match = catalogue.season_mask(current_season)
+        return tuple(
+            (i, score_by_crop[i], bool(soil_match[i]), bool(season_match[i]))
+            for i in catalogue.top_k(scores, candidates, 5).tolist()
+        )
+    
+    def _recommendation(self, crop: Dict, score: int, soil_match: bool, season_match: bool, soil_type: str,
+                        location: str, current_season: str, farm_size: float) -> Dict:
+        profit = BASE_PROFIT[crop["profit_margin"]] * farm_size
+        investment = profit * 0.3  # Rough estimate
+        return {
+            "crop": crop["name"],
+            "score": score,
+            "confidence": "High" if score > 70 else "Medium" if score > 50 else "Low",
+            "suitability_analysis": {
+                "soil_match": soil_match,
+                "season_match": season_match,
+                "market_demand": crop["market_demand"],
+                "risk_level": crop["risk_factor"]
+            },
+            "economic_analysis": {
+                "estimated_profit_per_hectare": profit,
+                "investment_required": round(investment, 2),
+                "return_on_investment": round((profit - investment) / investment * 100, 2) if investment else 0.0,
+                "breakeven_period": f"{crop['duration_days']} days"
+            },
+            "growing_requirements": {
+                "duration_days": crop["duration_days"],
+                "water_needs": crop["water_requirements"],
+                "temperature_range": f"{crop['temperature_range'][0]}-{crop['temperature_range'][1]}°C",
+                "ideal_ph": f"{crop['ph_range'][0]}-{crop['ph_range'][1]}"
+            },
+            "recommendation_reasons": self.generate_recommendation_reasons(
+                crop, score, soil_type, location, current_season
+            )
+        }
     
-    def generate_recommendation_reasons(self, crop: Dict, score: float, soil_type: str, location: str) -> List[str]:
+    def generate_recommendation_reasons(self, crop: Dict, score: float, soil_type: str, location: str,
+                                        current_season: Optional[str] = None) -> List[str]:
         """Generate specific reasons for recommendation"""
         reasons = []
-        current_season = self.get_current_season(location)
+        if current_season is None:
+            current_season = self.get_current_season(location)
         
         if soil_type.lower() in [s.lower() for s in crop["suitable_soil"]]:
             reasons.append(f"Ideal for {soil_type} soil type")
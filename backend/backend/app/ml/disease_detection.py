@@ -1,12 +1,86 @@
 import io
-from typing import Dict, List
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
 
 import numpy as np
 from PIL import Image
 
+DISEASE_MODEL_PATH = os.getenv("DISEASE_MODEL_PATH", "models/plant_disease_float32.tflite")
+DISEASE_MODEL_INT8_PATH = os.getenv("DISEASE_MODEL_INT8_PATH", "models/plant_disease_int8.tflite")
+DISEASE_MODEL_PRECISION = os.getenv("DISEASE_MODEL_PRECISION", "float32")  # "float32" or "int8"
+DISEASE_MODEL_THREADS = int(os.getenv("DISEASE_MODEL_THREADS", "1"))
+IMAGE_SIZE = (224, 224)
+
+
+def _load_interpreter_class():
+    """Prefer the slim tflite-runtime wheel, fall back to full TensorFlow"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        import tensorflow as tf
+        return tf.lite.Interpreter
+    except ImportError:
+        return None
+
+
+class TFLiteClassifier:
+    """Thin wrapper over a TFLite interpreter handling input/output quantization"""
+
+    def __init__(self, model_path: str, num_threads: int = DISEASE_MODEL_THREADS):
+        interpreter_class = _load_interpreter_class()
+        if interpreter_class is None:
+            raise RuntimeError("Neither tflite-runtime nor tensorflow is installed")
+
+        self.model_path = model_path
+        self.interpreter = interpreter_class(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.input_dtype = self.input_details["dtype"]
+        self.is_quantized = self.input_dtype in (np.uint8, np.int8)
+
+    def _quantize_input(self, image_array: np.ndarray) -> np.ndarray:
+        """Map uint8 pixels onto the model's input domain without a float round trip where possible"""
+        if not self.is_quantized:
+            if image_array.dtype == np.uint8:
+                return image_array.astype(np.float32) * (1.0 / 255.0)
+            return image_array.astype(np.float32, copy=False)
+
+        scale, zero_point = self.input_details["quantization"]
+        pixels = image_array if image_array.dtype == np.uint8 else np.clip(image_array * 255.0, 0, 255).astype(np.uint8)
+
+        # Typical post-training quantization of [0, 1] inputs: scale == 1/255
+        if abs(scale * 255.0 - 1.0) < 1e-3:
+            if self.input_dtype == np.uint8 and zero_point == 0:
+                return pixels
+            if self.input_dtype == np.int8 and zero_point == -128:
+                return (pixels.astype(np.int16) - 128).astype(np.int8)
+
+        info = np.iinfo(self.input_dtype)
+        quantized = np.round(pixels.astype(np.float32) / 255.0 / scale + zero_point)
+        return np.clip(quantized, info.min, info.max).astype(self.input_dtype)
+
+    def predict(self, image_array: np.ndarray) -> np.ndarray:
+        self.interpreter.set_tensor(self.input_details["index"], self._quantize_input(image_array))
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self.output_details["index"])[0]
+
+        if output.dtype in (np.uint8, np.int8):
+            scale, zero_point = self.output_details["quantization"]
+            output = (output.astype(np.float32) - zero_point) * scale
+
+        output = np.clip(output.astype(np.float64), 0, None)
+        total = output.sum()
+        return output / total if total > 0 else np.full(len(output), 1.0 / len(output))
+
 
 class DiseaseDetectionModel:
-    def __init__(self):
+    def __init__(self, precision: str = DISEASE_MODEL_PRECISION, model_path: Optional[str] = None):
         self.class_names = [
             'Apple___Apple_scab', 'Apple___Black_rot', 'Apple___Cedar_apple_rust', 'Apple___healthy',
             'Blueberry___healthy', 'Cherry___Powdery_mildew', 'Cherry___healthy',
@@ -20,33 +94,54 @@ class DiseaseDetectionModel:
             'Tomato___Spider_mites Two-spotted_spider_mite', 'Tomato___Target_Spot',
             'Tomato___Tomato_Yellow_Leaf_Curl_Virus', 'Tomato___Tomato_mosaic_virus', 'Tomato___healthy'
         ]
-    
-    def preprocess_image(self, image_bytes):
-        """Preprocess image for model prediction"""
+        self._class_names_lower = [cls.lower() for cls in self.class_names]
+
+        self.precision = "int8" if precision == "int8" else "float32"
+        self.model_path = model_path or (DISEASE_MODEL_INT8_PATH if self.precision == "int8" else DISEASE_MODEL_PATH)
+        self.classifier = None
+        if self.model_path and Path(self.model_path).is_file():
+            try:
+                self.classifier = TFLiteClassifier(self.model_path)
+                print(f"✅ Disease model loaded ({self.precision}): {self.model_path}")
+            except Exception as e:
+                print(f"❌ Disease model load error: {e}")
+
+    def preprocess_image(self, image_bytes, dtype=None):
+        """Preprocess image for model prediction.
+
+        Quantized models take the decoded uint8 pixels as-is; float models get
+        float32 in [0, 1]."""
+        if dtype is None:
+            dtype = np.uint8 if self.precision == "int8" else np.float32
+
         image = Image.open(io.BytesIO(image_bytes))
-        image = image.resize((224, 224))
-        image_array = np.array(image) / 255.0
-        image_array = np.expand_dims(image_array, axis=0)
-        return image_array
-    
+        image.draft("RGB", IMAGE_SIZE)  # Let JPEG decode at reduced scale
+        image = image.convert("RGB").resize(IMAGE_SIZE, Image.BILINEAR)
+        image_array = np.asarray(image, dtype=np.uint8)
+        if dtype != np.uint8:
+            image_array = image_array.astype(np.float32) * (1.0 / 255.0)
+        return np.expand_dims(image_array, axis=0)
+
+    def _predict_probabilities(self, image_bytes) -> np.ndarray:
+        processed_image = self.preprocess_image(image_bytes)
+        if self.classifier is not None:
+            return self.classifier.predict(processed_image)
+
+        # Mock prediction probabilities (no trained model deployed)
+        np.random.seed(hash(image_bytes) % 10000)
+        return np.random.dirichlet(np.ones(len(self.class_names)), size=1)[0]
+
     def predict_disease(self, image_bytes, crop_type=None):
         """Predict disease from image with enhanced logic"""
         try:
-            # Mock prediction (replace with actual trained model)
-            processed_image = self.preprocess_image(image_bytes)
-            
-            # Mock prediction probabilities
-            np.random.seed(hash(image_bytes) % 10000)
-            probabilities = np.random.dirichlet(np.ones(len(self.class_names)), size=1)[0]
+            probabilities = self._predict_probabilities(image_bytes)
             
             # Filter by crop type if provided
             if crop_type:
-                crop_specific_classes = [cls for cls in self.class_names if crop_type.lower() in cls.lower()]
-                if crop_specific_classes:
+                crop_mask = np.array([crop_type.lower() in cls for cls in self._class_names_lower])
+                if crop_mask.any():
                     # Enhance probabilities for crop-specific classes
-                    for i, cls in enumerate(self.class_names):
-                        if cls in crop_specific_classes:
-                            probabilities[i] *= 2
+                    probabilities = np.where(crop_mask, probabilities * 2, probabilities)
                     probabilities = probabilities / np.sum(probabilities)  # Renormalize
             
             top_idx = np.argmax(probabilities)
@@ -86,14 +181,15 @@ class DiseaseDetectionModel:
             return {
                 "primary_prediction": {
                     "disease": predicted_disease,
-                    "confidence": round(confidence * 100, 2),
+                    "confidence": round(float(confidence) * 100, 2),
                     "severity": severity,
                     "risk_level": risk_level,
                     "treatment_recommendation": treatment
                 },
                 "alternative_predictions": top_predictions[1:],
                 "is_healthy": 'healthy' in predicted_disease.lower(),
-                "confidence_score": round(confidence * 100, 2)
+                "confidence_score": round(float(confidence) * 100, 2),
+                "model_precision": self.precision if self.classifier is not None else "mock"
             }
             
         except Exception as e:
@@ -138,4 +234,100 @@ def get_treatment_recommendation(disease, risk_level, crop_name):
                   "bacterial" if 'bacterial' in disease.lower() else \
                   "viral" if 'virus' in disease.lower() else "general"
     
-    return treatments[risk_level][disease_type]
\ No newline at end of file
+    return treatments[risk_level][disease_type]
+
+
+def _load_fixture_set(fixture_dir: str) -> List[tuple]:
+    """Fixture layout mirrors PlantVillage: <fixture_dir>/<class_name>/<image>"""
+    fixtures = []
+    for class_dir in sorted(Path(fixture_dir).iterdir()):
+        if not class_dir.is_dir():
+            continue
+        for image_path in sorted(class_dir.iterdir()):
+            if image_path.suffix.lower() in (".jpg", ".jpeg", ".png"):
+                fixtures.append((class_dir.name, image_path.read_bytes()))
+    return fixtures
+
+
+def _benchmark_variant(model: DiseaseDetectionModel, fixtures: List[tuple], repeats: int) -> Dict:
+    predictions = []
+    latencies = []
+    for _ in range(repeats):
+        predictions = []
+        for _, image_bytes in fixtures:
+            start = time.perf_counter()
+            probabilities = model._predict_probabilities(image_bytes)
+            latencies.append(time.perf_counter() - start)
+            predictions.append(int(np.argmax(probabilities)))
+
+    labelled = [(label, pred) for (label, _), pred in zip(fixtures, predictions) if label in model.class_names]
+    correct = sum(1 for label, pred in labelled if model.class_names[pred] == label)
+    latencies_ms = np.array(latencies) * 1000
+
+    return {
+        "precision": model.precision,
+        "model_path": model.model_path,
+        "accuracy": round(correct / len(labelled), 4) if labelled else None,
+        "latency_ms_p50": round(float(np.percentile(latencies_ms, 50)), 3),
+        "latency_ms_p95": round(float(np.percentile(latencies_ms, 95)), 3),
+        "images_per_second_per_core": round(1000.0 / float(latencies_ms.mean()) / DISEASE_MODEL_THREADS, 2),
+        "predictions": predictions,
+    }
+
+
+def compare_model_variants(fixture_dir: str, repeats: int = 3) -> Dict:
+    """Accuracy-vs-latency report for the float32 and int8 disease models on a local fixture set"""
+    fixtures = _load_fixture_set(fixture_dir)
+    if not fixtures:
+        raise ValueError(f"No fixture images found under {fixture_dir}")
+
+    float_model = DiseaseDetectionModel(precision="float32")
+    int8_model = DiseaseDetectionModel(precision="int8")
+    if float_model.classifier is None or int8_model.classifier is None:
+        raise RuntimeError("Both DISEASE_MODEL_PATH and DISEASE_MODEL_INT8_PATH must point to loadable models")
+
+    float_report = _benchmark_variant(float_model, fixtures, repeats)
+    int8_report = _benchmark_variant(int8_model, fixtures, repeats)
+    agreement = np.mean(np.array(float_report.pop("predictions")) == np.array(int8_report.pop("predictions")))
+
+    return {
+        "fixtures": len(fixtures),
+        "float32": float_report,
+        "int8": int8_report,
+        "top1_agreement": round(float(agreement), 4),
+        "speedup": round(int8_report["images_per_second_per_core"] / float_report["images_per_second_per_core"], 2),
+    }
+
+
+def quantize_to_int8(saved_model_dir: str, fixture_dir: str, output_path: str = DISEASE_MODEL_INT8_PATH) -> str:
+    """Full-integer post-training quantization with uint8 input/output, calibrated on the fixture set"""
+    import tensorflow as tf
+
+    calibration = DiseaseDetectionModel(precision="float32", model_path="")
+    fixtures = _load_fixture_set(fixture_dir)
+
+    def representative_dataset():
+        for _, image_bytes in fixtures[:200]:
+            yield [calibration.preprocess_image(image_bytes, dtype=np.float32)]
+
+    converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(output_path).write_bytes(converter.convert())
+    return output_path
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m app.ml.disease_detection <fixture_dir> [repeats]")
+        sys.exit(1)
+    report = compare_model_variants(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3)
+    print(json.dumps(report, indent=2))
\ No newline at end of file
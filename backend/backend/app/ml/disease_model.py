@@ -1,10 +1,19 @@
-def predict_crop_disease(crop_name: str, temperature: float, humidity: float, soil_type: str):
+from app.ml.agro_zones import zone_index
+
+
+def predict_crop_disease(crop_name: str, temperature: float, humidity: float, soil_type: str,
+                         location: str = None):
     risk = "Low"
     if humidity > 80 and temperature > 30:
         risk = "High"
     elif 60 < humidity <= 80 and 25 < temperature <= 30:
         risk = "Medium"
 
+    # Fungal pressure peaks in the local monsoon, which varies by agro-climatic zone
+    season = zone_index.season_for(location) if location else None
+    if season == "monsoon" and risk == "Low" and humidity > 70:
+        risk = "Medium"
+
     if "clay" in soil_type.lower():
         risk = "Higher"
     elif "sandy" in soil_type.lower() and risk == "High":
@@ -15,6 +24,7 @@ def predict_crop_disease(crop_name: str, temperature: float, humidity: float, so
         "temperature": temperature,
         "humidity": humidity,
         "soil_type": soil_type,
+        "season": season,
         "predicted_disease_risk": risk,
         "suggested_action": "Spray antifungal" if risk in ["High", "Higher"] else "Normal monitoring"
     }
\ No newline at end of file
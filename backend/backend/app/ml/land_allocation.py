@@ -0,0 +1,166 @@
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.ml.crop_recommendation import RISK_LEVELS, WATER_UNITS, crop_recommender
+
+try:
+    from scipy.optimize import linprog
+except ImportError:  # scipy ships with scikit-learn; fall back to the greedy solver without it
+    linprog = None
+
+
+def _prune_dominated(candidates, net_return, catalogue, farm_size, cap):
+    """Keep only the best crops of each resource profile.
+
+    Crops with identical (investment, water, risk) per hectare are
+    interchangeable apart from return, so an optimal plan never uses more than
+    ceil(farm_size / cap) of them, always the highest-returning ones. This
+    shrinks a catalogue of thousands to a few dozen LP variables."""
+    if candidates.size == 0 or cap <= 0:
+        return candidates[:0]
+    per_profile = int(np.ceil(farm_size / cap - 1e-9))
+    group = catalogue.resource_profile[candidates]
+    order = np.lexsort((candidates, -net_return[candidates], group))
+    sorted_group = group[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_group)) + 1]
+    rank = np.arange(order.size) - np.repeat(starts, np.diff(np.r_[starts, order.size]))
+    return np.sort(candidates[order[rank < per_profile]])
+
+
+def _solve_lp(net_return, constraints, limits, cap):
+    result = linprog(-net_return, A_ub=constraints, b_ub=limits, bounds=(0, cap), method="highs")
+    if result.status != 0:
+        return None
+    return np.clip(result.x, 0, cap)
+
+
+def _solve_greedy(net_return, investment, water, risk_excess, farm_size, budget, water_capacity, cap):
+    """Fill land in order of return per unit of the scarcest resource it consumes"""
+    usage = np.maximum.reduce([
+        np.full(net_return.size, 1.0 / farm_size),
+        investment / budget if budget > 0 else np.full(net_return.size, np.inf),
+        water / water_capacity,
+    ])
+    order = np.argsort(-net_return / usage, kind="stable")
+
+    allocation = np.zeros(net_return.size)
+    land_left, budget_left, water_left = farm_size, budget, water_capacity
+    risk_slack = 0.0
+    for i in order.tolist():
+        if land_left <= 1e-9:
+            break
+        limit = min(cap, land_left, budget_left / investment[i], water_left / water[i])
+        if risk_excess[i] > 0:
+            limit = min(limit, risk_slack / risk_excess[i])
+        if limit <= 1e-9:
+            continue
+        allocation[i] = limit
+        land_left -= limit
+        budget_left -= limit * investment[i]
+        water_left -= limit * water[i]
+        risk_slack -= limit * risk_excess[i]
+    return allocation
+
+
+def optimize_land_allocation(location: str, soil_type: str, previous_crops: List[str] = None,
+                             budget: float = 10000, farm_size: float = 1.0,
+                             water_availability: str = "high", max_risk: str = "medium",
+                             max_share: float = 0.5) -> Dict:
+    """Split farm_size hectares across crops to maximise expected net return.
+
+    Expected profit per hectare is the crop's base profit scaled by its
+    suitability score; investment follows recommend_crops (30% of profit).
+    Constraints: total land, total investment <= budget, average water use
+    <= water_availability, average risk <= max_risk, and no crop above
+    max_share of the farm."""
+    if farm_size <= 0:
+        raise ValueError("farm_size must be positive")
+    if water_availability not in WATER_UNITS or max_risk not in RISK_LEVELS:
+        raise ValueError("water_availability and max_risk must be one of: low, medium, high")
+
+    start = time.perf_counter()
+    catalogue = crop_recommender.catalogue
+    season = crop_recommender.get_current_season(location)
+    scores = catalogue.score(soil_type, season, previous_crops or [])
+
+    expected_profit = catalogue.base_profit * scores / 100.0
+    investment = catalogue.base_profit * 0.3
+    net_return = expected_profit - investment
+
+    cap = max(0.0, min(1.0, max_share)) * farm_size
+
+    # Crops that lose money can never be part of an optimal plan
+    candidates = np.flatnonzero(net_return > 0)
+    candidates = _prune_dominated(candidates, net_return, catalogue, farm_size, cap)
+    net_return = net_return[candidates]
+    investment = investment[candidates]
+    water = catalogue.water_units[candidates]
+    risk_excess = catalogue.risk_level[candidates] - RISK_LEVELS[max_risk]
+
+    water_capacity = WATER_UNITS[water_availability] * farm_size
+    constraints = np.vstack([np.ones(candidates.size), investment, water, risk_excess])
+    limits = np.array([farm_size, budget, water_capacity, 0.0])
+
+    allocation = None
+    solver = "greedy"
+    if candidates.size and linprog is not None:
+        allocation = _solve_lp(net_return, constraints, limits, cap)
+        solver = "linprog-highs"
+    if allocation is None:
+        allocation = _solve_greedy(net_return, investment, water, risk_excess,
+                                   farm_size, budget, water_capacity, cap) if candidates.size else np.zeros(0)
+        solver = "greedy"
+
+    used = constraints @ allocation if candidates.size else np.zeros(4)
+    selected = np.flatnonzero(allocation > 1e-6)
+    selected = selected[np.argsort(-allocation[selected], kind="stable")]
+
+    allocations = []
+    for j in selected.tolist():
+        i = int(candidates[j])
+        hectares = float(allocation[j])
+        allocations.append({
+            "crop": catalogue.crops[i]["name"],
+            "hectares": round(hectares, 3),
+            "share": round(hectares / farm_size, 4),
+            "score": int(scores[i]),
+            "expected_profit": round(float(expected_profit[i]) * hectares, 2),
+            "investment_required": round(float(investment[j]) * hectares, 2),
+            "expected_net_return": round(float(net_return[j]) * hectares, 2),
+            "water_needs": catalogue.crops[i]["water_requirements"],
+            "risk_level": catalogue.crops[i]["risk_factor"]
+        })
+
+    land_used = float(used[0])
+    constraint_names = ["land", "budget", "water", "risk"]
+    binding = [
+        name for name, value, limit in zip(constraint_names, used, limits)
+        if candidates.size and value >= limit - 1e-6 * max(1.0, abs(limit))
+    ]
+
+    return {
+        "location": location,
+        "season": season,
+        "soil_type": soil_type,
+        "farm_size": farm_size,
+        "allocations": allocations,
+        "totals": {
+            "land_used": round(land_used, 3),
+            "land_unused": round(farm_size - land_used, 3),
+            "investment_required": round(float(used[1]), 2),
+            "expected_net_return": round(float(net_return @ allocation), 2) if candidates.size else 0.0,
+            "average_water_units": round(float(used[2]) / land_used, 3) if land_used else 0.0,
+            "average_risk_level": round(float(used[3]) / land_used + RISK_LEVELS[max_risk], 3) if land_used else 0.0
+        },
+        "constraints": {
+            "budget": budget,
+            "water_availability": water_availability,
+            "max_risk": max_risk,
+            "max_share": max_share,
+            "binding": binding
+        },
+        "solver": solver,
+        "solve_ms": round((time.perf_counter() - start) * 1000, 3)
+    }
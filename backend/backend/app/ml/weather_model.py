@@ -6,6 +6,8 @@ from typing import Any, Dict, List
 
 import requests
 
+from app.ml.agro_zones import zone_index
+
 
 def get_live_weather_data(location: str) -> Dict[str, Any]:
     """
@@ -78,9 +80,14 @@ def get_fallback_weather(location: str) -> Dict[str, Any]:
         "bangalore": {"temp": 27.3, "humidity": 58, "condition": "Sunny", "wind_speed": 10},
     }
     
-    location_key = location.lower().split(',')[0].strip()
+    location_key = zone_index.normalize_location(location)
     default_weather = {"temp": 30.0, "humidity": 60, "condition": "Sunny", "wind_speed": 15}
     
+    # Unknown cities fall back to their agro-climatic zone's typical temperature
+    climate = zone_index.climate_for(location)
+    if climate:
+        default_weather["temp"] = float(climate["base_temp"] + 3)
+    
     weather_data = location_weather.get(location_key, default_weather)
     weather_data["source"] = "Fallback Data"
     weather_data["success"] = False
@@ -102,8 +109,9 @@ def generate_historical_weather_data(location: str, days: int = 90) -> List[Dict
         "bangalore": {"base_temp": 24, "rain_prob": 0.15, "seasonal_variation": 3},
     }
     
-    location_key = location.lower().split(',')[0].strip()
-    pattern = location_patterns.get(location_key, {"base_temp": 25, "rain_prob": 0.15, "seasonal_variation": 5})
+    location_key = zone_index.normalize_location(location)
+    pattern = location_patterns.get(location_key) or zone_index.climate_for(location) or \
+        {"base_temp": 25, "rain_prob": 0.15, "seasonal_variation": 5}
     
     states = ["Sunny", "Cloudy", "Rainy", "Storm"]
     
@@ -1,8 +1,8 @@
 from datetime import datetime
 
 from app.database import Base
-from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        String, Text)
+from sqlalchemy import (JSON, Boolean, Column, Date, DateTime, Float,
+                        ForeignKey, Index, Integer, String, Text)
 from sqlalchemy.orm import relationship
 
 
@@ -29,7 +29,7 @@ class Farmer(Base):
     location = Column(String)
     soil_type = Column(String)
     contact = Column(String, unique=True)
-    crops = relationship("Crop", back_populates="farmer")
+    crops = relationship("Crop", back_populates="farmer", order_by="Crop.id")
 
 class Vendor(Base):
     __tablename__ = "vendors"
@@ -43,7 +43,7 @@ class Crop(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     soil_type = Column(String)
-    farmer_id = Column(Integer, ForeignKey("farmers.id"))
+    farmer_id = Column(Integer, ForeignKey("farmers.id"), index=True)
     price = Column(Float)
     season = Column(String, default="All")  # Make sure this exists
     status = Column(String, default="Healthy")
@@ -51,29 +51,90 @@ class Crop(Base):
     
 class MarketListing(Base):
     __tablename__ = "market_listings"
+    # Crop + price-range and crop + vendor search filters (both also serve crop_id alone);
+    # the text search indexes on crops/vendors live in the 0003 migration
+    __table_args__ = (
+        Index("ix_market_listings_crop_price", "crop_id", "price"),
+        Index("ix_market_listings_crop_vendor", "crop_id", "vendor_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     crop_id = Column(Integer, ForeignKey("crops.id"))
-    vendor_id = Column(Integer, ForeignKey("vendors.id"))
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), index=True)
+    price = Column(Float, index=True)
+    quantity = Column(Float)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+
+class MarketListingDetail(Base):
+    """Denormalized listing read model: one row per listing with its crop and vendor
+    fields, kept in sync by app/read_models.py on every write path"""
+    __tablename__ = "market_listing_details"
+    listing_id = Column(Integer, ForeignKey("market_listings.id", ondelete="CASCADE"), primary_key=True)
+    crop_id = Column(Integer, index=True)
+    vendor_id = Column(Integer, index=True)
     price = Column(Float)
     quantity = Column(Float)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime)
+    crop_name = Column(String)
+    vendor_name = Column(String)
+    vendor_location = Column(String)
+    vendor_contact = Column(String)
+
+class ListingInterest(Base):
+    """Persisted interest count per listing, flushed in batches by app/counters.py"""
+    __tablename__ = "listing_interest"
+    listing_id = Column(Integer, ForeignKey("market_listings.id", ondelete="CASCADE"), primary_key=True)
+    interest_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
 
 class Transaction(Base):
     __tablename__ = "transactions"
     id = Column(Integer, primary_key=True, index=True)
-    farmer_id = Column(Integer, ForeignKey("farmers.id"))
-    vendor_id = Column(Integer, ForeignKey("vendors.id"))
+    farmer_id = Column(Integer, ForeignKey("farmers.id"), index=True)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), index=True)
     crop_id = Column(Integer, ForeignKey("crops.id"))
     amount = Column(Float)
-    date = Column(DateTime, default=datetime.utcnow)
+    date = Column(DateTime, default=datetime.utcnow, index=True)
     notes = Column(Text)
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)
+
+class TransactionRollup(Base):
+    """Daily transaction count and amount per farmer, vendor, crop and overall ("all", key 0),
+    maintained by app/rollups.py"""
+    __tablename__ = "transaction_daily_rollups"
+    dimension = Column(String, primary_key=True)
+    key_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    total_amount = Column(Float, default=0.0, nullable=False)
 
 class Notification(Base):
     __tablename__ = "notifications"
+    # Per-user unread filter/count, and the per-user newest-first list
+    __table_args__ = (
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+        Index("ix_notifications_user_created", "user_id", "created_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String)
     message = Column(Text)
     type = Column(String)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class UnreadNotificationCount(Base):
+    """Maintained per-user unread count so polling never runs COUNT(*)"""
+    __tablename__ = "notification_unread_counts"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class FarmerRecommendation(Base):
+    """Crop recommendations materialized by the nightly batch job"""
+    __tablename__ = "farmer_recommendations"
+    id = Column(Integer, primary_key=True, index=True)
+    farmer_id = Column(Integer, ForeignKey("farmers.id", ondelete="CASCADE"), unique=True, index=True)
+    season = Column(String)
+    soil_type = Column(String)
+    recommendations = Column(JSON)
+    computed_at = Column(DateTime, default=datetime.utcnow)
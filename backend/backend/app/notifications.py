@@ -0,0 +1,243 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from app import models
+from app.database import AsyncSessionLocal, dialect_insert
+from sqlalchemy import func, select
+
+UNREAD_CACHE_SIZE = int(os.getenv("UNREAD_CACHE_SIZE", "10000"))
+# Other workers' writes become visible after at most this many seconds
+UNREAD_CACHE_TTL = float(os.getenv("UNREAD_CACHE_TTL", "5"))
+
+# Push channel settings
+NOTIFICATION_STREAM_BUFFER = int(os.getenv("NOTIFICATION_STREAM_BUFFER", "100"))
+NOTIFICATION_HEARTBEAT_SECONDS = float(os.getenv("NOTIFICATION_HEARTBEAT_SECONDS", "15"))
+NOTIFICATION_REPLAY_LIMIT = int(os.getenv("NOTIFICATION_REPLAY_LIMIT", "100"))
+NOTIFICATION_RETRY_MS = int(os.getenv("NOTIFICATION_RETRY_MS", "3000"))
+
+
+class UnreadCountCache:
+    """Small per-worker LRU of unread counts with a short TTL"""
+
+    def __init__(self, maxsize: int = UNREAD_CACHE_SIZE, ttl: float = UNREAD_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, user_id: int, count: int):
+        with self._lock:
+            self._entries[user_id] = (count, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[int]):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def unread_counts_upsert(db, deltas: Dict[int, int]):
+    """INSERT ... ON CONFLICT that adds each user's delta to their stored unread count"""
+    insert = dialect_insert(db)
+    now = datetime.utcnow()
+    counter = models.UnreadNotificationCount
+    stmt = insert(counter).values([
+        {"user_id": user_id, "unread_count": delta, "updated_at": now}
+        for user_id, delta in sorted(deltas.items())
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[counter.user_id],
+        set_={
+            "unread_count": counter.unread_count + stmt.excluded.unread_count,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+
+
+async def adjust_unread_counts(db, deltas: Dict[int, int]):
+    """Apply unread-count changes inside the caller's transaction"""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if user_id is not None and delta}
+    if deltas:
+        await db.execute(unread_counts_upsert(db, deltas))
+
+
+# Initialize the unread count cache
+unread_cache = UnreadCountCache()
+
+
+class NotificationBroker:
+    """In-process pub/sub feeding the per-user notification streams.
+
+    Every connection gets a bounded queue. A subscriber that falls behind is
+    cut off rather than buffered without limit; its client reconnects with
+    Last-Event-ID and replays what it missed from the notifications table."""
+
+    def __init__(self, buffer_size: int = 0):
+        self.buffer_size = buffer_size or NOTIFICATION_STREAM_BUFFER
+        self._subscribers: Dict[int, set] = {}
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self, user_id: int) -> "asyncio.Queue":
+        queue = asyncio.Queue(maxsize=self.buffer_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: "asyncio.Queue"):
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def publish(self, user_id: int, event: str, data: Dict, event_id: Optional[int] = None):
+        """Queue an event for every open stream of `user_id` (call from the event loop)"""
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait((event, data, event_id))
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and tell the stream to close
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                self.unsubscribe(user_id, queue)
+                self.dropped_subscribers += 1
+        self.published += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._subscribers),
+            "connections": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+def notification_payload(notification: models.Notification) -> Dict:
+    return {
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message,
+        "type": notification.type,
+        "is_read": bool(notification.is_read),
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+def format_sse(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _missed_notifications(user_id: int, after_id: int) -> List[models.Notification]:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(models.Notification).where(
+                models.Notification.user_id == user_id,
+                models.Notification.id > after_id
+            ).order_by(models.Notification.id).limit(NOTIFICATION_REPLAY_LIMIT)
+        )).scalars().all()
+
+
+async def _latest_notification_id(user_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(func.max(models.Notification.id)).where(models.Notification.user_id == user_id)
+        )).scalar() or 0
+
+
+async def _catch_up(user_id: int, after_id: int):
+    """Every notification after `after_id`, oldest first, NOTIFICATION_REPLAY_LIMIT rows per query"""
+    while True:
+        batch = await _missed_notifications(user_id, after_id)
+        for notification in batch:
+            yield notification
+        if len(batch) < NOTIFICATION_REPLAY_LIMIT:
+            return
+        after_id = batch[-1].id
+
+
+async def notification_stream(request, user_id: int, last_event_id: Optional[int] = None):
+    """Server-sent events for one user: replay after `last_event_id`, then live pushes.
+
+    A fresh connection (no `last_event_id`) starts at the user's newest
+    notification instead of replaying their history. Notifications always
+    go out from the table in id order: a live "notification" event only
+    triggers a catch-up after the last id sent, so rows behind it that the
+    stream has not seen yet are never skipped. Heartbeats keep proxies from
+    closing the idle connection and also catch up, which picks up
+    notifications written by other workers."""
+    # Fresh connections start after the newest id as of now, read before subscribing: anything
+    # committed later is above it, so the catch-up below delivers it whether or not its live event
+    # reached the queue
+    last_sent = last_event_id if last_event_id is not None else await _latest_notification_id(user_id)
+    queue = notification_broker.subscribe(user_id)
+    try:
+        yield f"retry: {NOTIFICATION_RETRY_MS}\n\n"
+        # Subscribed before catching up, so a notification committed meanwhile is either read here
+        # or triggers another catch-up from the queue
+        async for notification in _catch_up(user_id, last_sent):
+            yield format_sse("notification", notification_payload(notification), notification.id)
+            last_sent = notification.id
+
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=NOTIFICATION_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+                message = ("notification", None, None)  # catch up as if notified
+
+            if message is None:
+                break
+            event, data, event_id = message
+            if event != "notification":
+                yield format_sse(event, data, event_id)
+                continue
+            if event_id is not None and event_id <= last_sent:
+                continue
+            async for notification in _catch_up(user_id, last_sent):
+                yield format_sse("notification", notification_payload(notification), notification.id)
+                last_sent = notification.id
+    finally:
+        notification_broker.unsubscribe(user_id, queue)
+
+
+# Initialize the notification broker
+notification_broker = NotificationBroker()
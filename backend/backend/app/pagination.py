@@ -0,0 +1,106 @@
+import base64
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import func, select, text
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+# How long a table's estimated row count is reused before being refreshed
+COUNT_ESTIMATE_TTL = float(os.getenv("COUNT_ESTIMATE_TTL", "60"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_ESTIMATE_HEADER = "X-Total-Count-Estimate"
+
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint"""
+
+    def __init__(self,
+                 limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+                 cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+                 include_total: bool = Query(False, description="Add an estimated total in X-Total-Count-Estimate")):
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+
+
+def encode_cursor(last_id: int, rank: Optional[int] = None) -> str:
+    """Opaque cursor for the row after `last_id`; `rank` is the relevance level for ranked results"""
+    payload = {"id": last_id} if rank is None else {"id": last_id, "rank": rank}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> Dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        int(payload["id"])
+        return payload
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    return int(_decode(cursor)["id"])
+
+
+def decode_ranked_cursor(cursor: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not cursor:
+        return None
+    payload = _decode(cursor)
+    if not isinstance(payload.get("rank"), int):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return payload["rank"], int(payload["id"])
+
+
+_count_cache: Dict[str, Tuple[int, float]] = {}
+
+
+async def estimated_count(db, table) -> int:
+    """Approximate row count: planner statistics on PostgreSQL, a cached COUNT(*) elsewhere"""
+    cached = _count_cache.get(table.name)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    estimate = -1
+    if db.get_bind().dialect.name == "postgresql":
+        estimate = (await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table.name}
+        )).scalar() or -1
+    if estimate < 0:
+        # Never analyzed (or not PostgreSQL): count once and keep it for the TTL
+        estimate = (await db.execute(select(func.count()).select_from(table))).scalar()
+
+    _count_cache[table.name] = (estimate, time.monotonic() + COUNT_ESTIMATE_TTL)
+    return estimate
+
+
+async def paginate(db, query, id_column, page: PageParams, response: Response,
+                   descending: bool = False, count_table=None, columns: bool = False):
+    """Fetch one keyset page of `query` ordered by `id_column`.
+
+    Reads limit + 1 rows to learn whether another page exists without a
+    count; the opaque cursor for it goes in the X-Next-Cursor header. With
+    `columns` a column-only query's Rows are returned instead of ORM objects."""
+    after = decode_cursor(page.cursor)
+    if after is not None:
+        query = query.where(id_column < after if descending else id_column > after)
+    query = query.order_by(id_column.desc() if descending else id_column).limit(page.limit + 1)
+
+    result = await db.execute(query)
+    rows = result.all() if columns else result.scalars().all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(rows[-1], id_column.key))
+
+    if page.include_total and count_table is not None:
+        response.headers[TOTAL_ESTIMATE_HEADER] = str(await estimated_count(db, count_table))
+    return rows
+
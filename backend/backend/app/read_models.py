@@ -0,0 +1,69 @@
+from typing import Iterable, List
+
+from app import models
+from app.database import dialect_insert
+from sqlalchemy import delete, or_, select, true
+
+DETAIL_COLUMNS = [
+    "listing_id", "crop_id", "vendor_id", "price", "quantity", "timestamp",
+    "crop_name", "vendor_name", "vendor_location", "vendor_contact",
+]
+
+
+def _source(where):
+    listing = models.MarketListing
+    return select(
+        listing.id, listing.crop_id, listing.vendor_id, listing.price, listing.quantity, listing.timestamp,
+        models.Crop.name, models.Vendor.name, models.Vendor.location, models.Vendor.contact
+    ).outerjoin(models.Crop, models.Crop.id == listing.crop_id).outerjoin(
+        models.Vendor, models.Vendor.id == listing.vendor_id
+    ).where(where)
+
+
+def listing_detail_upsert(db, where):
+    """INSERT ... SELECT ... ON CONFLICT that (re)builds the detail rows of the listings matching `where`"""
+    insert = dialect_insert(db)
+    stmt = insert(models.MarketListingDetail).from_select(DETAIL_COLUMNS, _source(where))
+    return stmt.on_conflict_do_update(
+        index_elements=[models.MarketListingDetail.listing_id],
+        set_={name: stmt.excluded[name] for name in DETAIL_COLUMNS[1:]}
+    )
+
+
+async def sync_listing_details(db, listing_ids: Iterable[int] = (), crop_ids: Iterable[int] = (),
+                               vendor_ids: Iterable[int] = ()):
+    """Refresh the detail rows touched by a write, inside the caller's transaction"""
+    listing = models.MarketListing
+    conditions = []
+    if listing_ids:
+        conditions.append(listing.id.in_(list(listing_ids)))
+    if crop_ids:
+        conditions.append(listing.crop_id.in_(list(crop_ids)))
+    if vendor_ids:
+        conditions.append(listing.vendor_id.in_(list(vendor_ids)))
+    if conditions:
+        await db.execute(listing_detail_upsert(db, or_(*conditions)))
+
+
+async def remove_listing_details(db, listing_ids: List[int]):
+    # ON DELETE CASCADE covers PostgreSQL; SQLite doesn't enforce foreign keys by default
+    await db.execute(delete(models.MarketListingDetail).where(models.MarketListingDetail.listing_id.in_(listing_ids)))
+
+
+async def get_listing_details(db, listing_ids: List[int]) -> List[models.MarketListingDetail]:
+    """Detail rows for `listing_ids` in the same order, in one primary-key lookup"""
+    if not listing_ids:
+        return []
+    rows = (await db.execute(
+        select(models.MarketListingDetail).where(models.MarketListingDetail.listing_id.in_(listing_ids))
+    )).scalars().all()
+    by_id = {row.listing_id: row for row in rows}
+    return [by_id[listing_id] for listing_id in listing_ids if listing_id in by_id]
+
+
+def rebuild_listing_details(db) -> int:
+    """Recreate the whole read model from the source tables in one transaction (sync session)"""
+    db.execute(delete(models.MarketListingDetail))
+    db.execute(listing_detail_upsert(db, true()))
+    db.commit()
+    return db.query(models.MarketListingDetail).count()
@@ -0,0 +1,190 @@
+import os
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app import models
+from app.database import dialect_insert
+from sqlalchemy import delete, func, literal, select, text
+
+TRANSACTION_ROLLUP_CHUNK_SIZE = int(os.getenv("TRANSACTION_ROLLUP_CHUNK_SIZE", "50000"))
+
+# PostgreSQL advisory lock keys shared by the transaction write path and the rollup rebuild
+ROLLUP_WRITE_LOCK = 470101
+ROLLUP_DELETE_LOCK = 470102
+
+# Rollup dimension -> transaction column it is keyed by; "all" is the platform total under key 0
+ROLLUP_DIMENSIONS = {
+    "farmer": models.Transaction.farmer_id,
+    "vendor": models.Transaction.vendor_id,
+    "crop": models.Transaction.crop_id,
+    "all": None,
+}
+SERIES_INTERVALS = ("day", "month", "year")
+
+
+def _upsert_adding(db, stmt):
+    """ON CONFLICT that adds the inserted count and amount to the stored rollup row"""
+    rollup = models.TransactionRollup
+    return stmt.on_conflict_do_update(
+        index_elements=[rollup.dimension, rollup.key_id, rollup.day],
+        set_={
+            "transaction_count": rollup.transaction_count + stmt.excluded.transaction_count,
+            "total_amount": rollup.total_amount + stmt.excluded.total_amount,
+        }
+    )
+
+
+def rollup_deltas(transactions: Iterable[models.Transaction], sign: int = 1) -> Dict[Tuple, List]:
+    """(dimension, key_id, day) -> [count, amount] changes for inserting (+1) or deleting (-1) rows"""
+    deltas = defaultdict(lambda: [0, 0.0])
+    for txn in transactions:
+        day = txn.date.date()
+        for dimension, column in ROLLUP_DIMENSIONS.items():
+            key_id = getattr(txn, column.key) if column is not None else 0
+            if key_id is None:
+                continue
+            delta = deltas[(dimension, key_id, day)]
+            delta[0] += sign
+            delta[1] += sign * (txn.amount or 0.0)
+    return deltas
+
+
+async def lock_rollups_for_write(db, deleting: bool = False):
+    """Take the shared rollup locks for the rest of the caller's transaction (PostgreSQL only).
+
+    Must run before the transaction row is inserted or deleted. Inserts only
+    wait while a rebuild clears the table; deletes wait for the whole rebuild,
+    since their row may sit in a chunk that has not been backfilled yet."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    await db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": ROLLUP_WRITE_LOCK})
+    if deleting:
+        await db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": ROLLUP_DELETE_LOCK})
+
+
+async def apply_transaction_rollups(db, transactions: Iterable[models.Transaction], sign: int = 1):
+    """Fold inserted or deleted transactions into the rollups, inside the caller's transaction.
+
+    Transactions must be flushed so their date default is populated."""
+    deltas = rollup_deltas(transactions, sign)
+    if not deltas:
+        return
+    stmt = dialect_insert(db)(models.TransactionRollup).values([
+        {"dimension": dimension, "key_id": key_id, "day": day, "transaction_count": count, "total_amount": amount}
+        for (dimension, key_id, day), (count, amount) in sorted(deltas.items())
+    ])
+    await db.execute(_upsert_adding(db, stmt))
+
+
+def _backfill_upsert(db, dimension: str, first_id: int, last_id: int):
+    """INSERT ... SELECT ... GROUP BY adding one id range of transactions to one dimension"""
+    txn = models.Transaction
+    column = ROLLUP_DIMENSIONS[dimension]
+    key = column if column is not None else literal(0)
+    day = func.date(txn.date)
+    source = select(
+        literal(dimension), key, day, func.count(), func.coalesce(func.sum(txn.amount), 0.0)
+    ).where(txn.id.between(first_id, last_id), txn.date.isnot(None))
+    if column is not None:
+        source = source.where(column.isnot(None)).group_by(column, day)
+    else:
+        source = source.group_by(day)
+
+    rollup = models.TransactionRollup
+    stmt = dialect_insert(db)(rollup).from_select(
+        [rollup.dimension, rollup.key_id, rollup.day, rollup.transaction_count, rollup.total_amount], source
+    )
+    return _upsert_adding(db, stmt)
+
+
+def rebuild_transaction_rollups(db, chunk_size: int = TRANSACTION_ROLLUP_CHUNK_SIZE) -> Dict[str, int]:
+    """Recompute every rollup from the transactions table in id-range chunks (sync session).
+
+    On PostgreSQL the rebuild holds ROLLUP_DELETE_LOCK throughout, and
+    ROLLUP_WRITE_LOCK while it clears the table and reads the max id. Writers
+    take both as shared locks (see lock_rollups_for_write), so no write is in
+    flight at the clear, every later insert gets an id above max_id and is
+    left to the live write path, and deletes wait until every chunk is in.
+    Elsewhere (SQLite, single writer) the whole rebuild is one transaction."""
+    txn = models.Transaction
+    postgresql = db.get_bind().dialect.name == "postgresql"
+    # One connection throughout: session-level advisory locks belong to it
+    with db.get_bind().connect() as connection:
+        if postgresql:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ROLLUP_DELETE_LOCK})
+        try:
+            if postgresql:
+                connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ROLLUP_WRITE_LOCK})
+            connection.execute(delete(models.TransactionRollup))
+            max_id = connection.execute(select(func.max(txn.id))).scalar() or 0
+            if postgresql:
+                connection.commit()
+
+            chunks = 0
+            for first_id in range(1, max_id + 1, chunk_size):
+                last_id = min(first_id + chunk_size - 1, max_id)
+                for dimension in ROLLUP_DIMENSIONS:
+                    connection.execute(_backfill_upsert(db, dimension, first_id, last_id))
+                if postgresql:
+                    connection.commit()
+                chunks += 1
+            connection.commit()
+        finally:
+            if postgresql:
+                connection.rollback()
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ROLLUP_DELETE_LOCK})
+                connection.commit()
+    return {"max_transaction_id": max_id, "chunks": chunks}
+
+
+def _range_filters(dimension: str, key_id: Optional[int], since: Optional[date], until: Optional[date]):
+    rollup = models.TransactionRollup
+    filters = [rollup.dimension == dimension]
+    if key_id is not None:
+        filters.append(rollup.key_id == key_id)
+    if since is not None:
+        filters.append(rollup.day >= since)
+    if until is not None:
+        filters.append(rollup.day < until)
+    return filters
+
+
+async def rollup_totals(db, dimension: str, key_id: Optional[int] = None, since: Optional[date] = None,
+                        until: Optional[date] = None, limit: int = 20) -> List[Dict]:
+    """Count and amount per key over [since, until), largest amount first"""
+    rollup = models.TransactionRollup
+    rows = (await db.execute(
+        select(rollup.key_id, func.sum(rollup.transaction_count), func.sum(rollup.total_amount))
+        .where(*_range_filters(dimension, key_id, since, until))
+        .group_by(rollup.key_id)
+        .having(func.sum(rollup.transaction_count) != 0)
+        .order_by(func.sum(rollup.total_amount).desc(), rollup.key_id)
+        .limit(limit)
+    )).all()
+    return [
+        {"key_id": row[0], "transaction_count": row[1], "total_amount": round(row[2], 2)}
+        for row in rows
+    ]
+
+
+async def rollup_series(db, dimension: str, key_id: int = 0, since: Optional[date] = None,
+                        until: Optional[date] = None, interval: str = "day") -> List[Dict]:
+    """Count and amount per day, month or year over [since, until); empty periods are omitted"""
+    rollup = models.TransactionRollup
+    rows = (await db.execute(
+        select(rollup.day, rollup.transaction_count, rollup.total_amount)
+        .where(*_range_filters(dimension, key_id, since, until))
+        .order_by(rollup.day)
+    )).all()
+
+    width = {"day": 10, "month": 7, "year": 4}[interval]
+    periods: Dict[str, List] = {}
+    for day, count, amount in rows:
+        period = periods.setdefault(day.isoformat()[:width], [0, 0.0])
+        period[0] += count
+        period[1] += amount
+    return [
+        {"period": period, "transaction_count": count, "total_amount": round(amount, 2)}
+        for period, (count, amount) in periods.items() if count
+    ]
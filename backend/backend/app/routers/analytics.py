@@ -1,53 +1,51 @@
-import os
-import shutil
-from pathlib import Path
-
 from app import schemas
 from app.database import get_db
+from app.ml.agro_zones import zone_index
 from app.ml.crop_recommendation import (crop_recommender,
                                         get_optimization_suggestions)
 from app.ml.disease_detection import (disease_model,
                                       get_treatment_recommendation)
 from app.ml.disease_model import predict_crop_disease
+from app.ml.land_allocation import optimize_land_allocation
 from app.ml.price_model import predict_price
 from app.ml.weather_model import get_live_weather_data, predict_weather
+from app.serialization import ResponseShape
+from app.storage import upload_storage
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
-
 @router.post("/price-predict")
-def price_predict(request: schemas.PricePredictRequest):
+def price_predict(request: schemas.PricePredictRequest, shape: ResponseShape = Depends()):
     try:
         result = predict_price(request.crop_name, request.current_state, request.steps)
-        return {
+        return shape.render({
             "forecast": result,
             "live_data": result.get("api_success", False),
             "data_source": result.get("data_source", "Unknown")
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Price prediction error: {str(e)}")
 
 @router.post("/disease-predict")
-def disease_predict(request: schemas.DiseasePredictRequest):
+def disease_predict(request: schemas.DiseasePredictRequest, shape: ResponseShape = Depends()):
     try:
         result = predict_crop_disease(request.crop_name, request.temperature, request.humidity, request.soil_type)
-        return {"disease_risk": result}
+        return shape.render({"disease_risk": result})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Disease prediction error: {str(e)}")
 
 @router.post("/weather-alerts")
-def weather_alerts(request: schemas.WeatherPredictRequest):
+def weather_alerts(request: schemas.WeatherPredictRequest, shape: ResponseShape = Depends()):
     try:
         result = predict_weather(request.location, request.days)
-        return {
+        return shape.render({
             "alerts": result,
             "live_data": result.get("api_success", False),
             "data_source": result.get("data_source", "Unknown")
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Weather prediction error: {str(e)}")
 
@@ -60,13 +58,9 @@ async def disease_detection_image(
     soil_type: str = Form("Loamy")
 ):
     try:
-        file_location = UPLOAD_DIR / f"{crop_name}_{file.filename}"
-        
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Read image for ML processing
+        # Read image once for both storage and ML processing
         image_bytes = await file.read()
+        upload_id = upload_storage.save_upload(image_bytes, crop_name, file.filename)
         
         # Get image-based prediction
         image_prediction = disease_model.predict_disease(image_bytes, crop_name)
@@ -85,7 +79,8 @@ async def disease_detection_image(
         
         return {
             "filename": file.filename,
-            "saved_path": str(file_location),
+            "upload_id": upload_id,
+            "thumbnail_url": f"/analytics/uploads/{upload_id}/thumbnail",
             "image_analysis": image_prediction,
             "environmental_analysis": environmental_risk,
             "combined_disease_risk": combined_risk,
@@ -99,13 +94,41 @@ async def disease_detection_image(
     except Exception as e:
         return {"error": f"Error processing image: {str(e)}"}
 
+@router.get("/uploads/{upload_id}/thumbnail")
+def get_upload_thumbnail(upload_id: str):
+    thumbnail = upload_storage.get_thumbnail(upload_id)
+    if not thumbnail:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return FileResponse(thumbnail, media_type="image/jpeg")
+
+@router.get("/uploads/stats")
+def get_upload_stats():
+    return upload_storage.stats()
+
+@router.get("/crop-recommendations/cache-stats")
+def get_crop_recommendation_cache_stats():
+    return {
+        "recommendations": crop_recommender.cache.stats(),
+        "location_normalization": zone_index.cache_stats()
+    }
+
+@router.post("/crop-catalogue/reload")
+def reload_crop_catalogue():
+    reloaded = crop_recommender.reload_catalogue(force=True)
+    return {
+        "reloaded": reloaded,
+        "catalogue_version": crop_recommender.catalogue_version,
+        "crop_count": crop_recommender.catalogue.size
+    }
+
 @router.get("/crop-recommendations")
 def get_crop_recommendations(
     location: str,
     soil_type: str,
     previous_crops: str = None,
     budget: float = 10000,
-    farm_size: float = 1.0
+    farm_size: float = 1.0,
+    shape: ResponseShape = Depends()
 ):
     try:
         previous_crops_list = []
@@ -123,22 +146,55 @@ def get_crop_recommendations(
         # Get current weather for additional insights
         current_weather = get_live_weather_data(location)
         
-        return {
+        return shape.render({
             "recommendations": recommendations,
             "location_analysis": {
                 "location": location,
                 "current_season": crop_recommender.get_current_season(location),
+                "agro_climatic_zone": zone_index.zone_info(location),
                 "current_weather": current_weather.get("condition", "Unknown"),
                 "temperature": current_weather.get("temp", 25.0)
             },
             "optimization_suggestions": get_optimization_suggestions(soil_type, farm_size)
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Crop recommendation error: {str(e)}")
 
+@router.get("/land-allocation")
+def get_land_allocation(
+    location: str,
+    soil_type: str,
+    previous_crops: str = None,
+    budget: float = 10000,
+    farm_size: float = 1.0,
+    water_availability: str = "high",
+    max_risk: str = "medium",
+    max_share: float = 0.5,
+    shape: ResponseShape = Depends()
+):
+    try:
+        previous_crops_list = []
+        if previous_crops:
+            previous_crops_list = [crop.strip() for crop in previous_crops.split(",")]
+        
+        return shape.render(optimize_land_allocation(
+            location=location,
+            soil_type=soil_type,
+            previous_crops=previous_crops_list,
+            budget=budget,
+            farm_size=farm_size,
+            water_availability=water_availability.lower(),
+            max_risk=max_risk.lower(),
+            max_share=max_share
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Land allocation error: {str(e)}")
+
 @router.get("/dashboard/{farmer_id}")
-def dashboard(farmer_id: int, db: Session = Depends(get_db)):
+def dashboard(farmer_id: int, shape: ResponseShape = Depends(), db: Session = Depends(get_db)):
     try:
         # Get farmer data
         from app import models
@@ -148,7 +204,7 @@ def dashboard(farmer_id: int, db: Session = Depends(get_db)):
         
         weather = predict_weather(farmer.location, 3)
         price = predict_price("Wheat", "Stable", 3)
-        disease = predict_crop_disease("Wheat", 27.0, 65.0, farmer.soil_type)
+        disease = predict_crop_disease("Wheat", 27.0, 65.0, farmer.soil_type, farmer.location)
         
         # Get crop recommendations
         crop_recommendations = crop_recommender.recommend_crops(
@@ -159,7 +215,7 @@ def dashboard(farmer_id: int, db: Session = Depends(get_db)):
             1.0
         )
         
-        return {
+        return shape.render({
             "farmer_id": farmer_id,
             "location": farmer.location,
             "soil_type": farmer.soil_type,
@@ -169,12 +225,12 @@ def dashboard(farmer_id: int, db: Session = Depends(get_db)):
             "crop_recommendations": crop_recommendations,
             "overall_risk_score": calculate_overall_risk(weather, disease),
             "farming_suggestions": generate_farming_suggestions(weather, crop_recommendations)
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dashboard error: {str(e)}")
 
 @router.get("/comprehensive-analysis/{farmer_id}")
-def comprehensive_analysis(farmer_id: int, db: Session = Depends(get_db)):
+def comprehensive_analysis(farmer_id: int, shape: ResponseShape = Depends(), db: Session = Depends(get_db)):
     """Complete analysis combining all ML models"""
     try:
         # Get farmer data
@@ -186,7 +242,7 @@ def comprehensive_analysis(farmer_id: int, db: Session = Depends(get_db)):
         # Get all predictions
         weather_pred = predict_weather(farmer.location, 7)
         price_pred = predict_price("Wheat", "Stable", 5)  # Default crop
-        disease_risk = predict_crop_disease("Wheat", 25.0, 65.0, farmer.soil_type)
+        disease_risk = predict_crop_disease("Wheat", 25.0, 65.0, farmer.soil_type, farmer.location)
         crop_recommendations = crop_recommender.recommend_crops(
             farmer.location, 
             farmer.soil_type, 
@@ -195,7 +251,7 @@ def comprehensive_analysis(farmer_id: int, db: Session = Depends(get_db)):
             1.0
         )
         
-        return {
+        return shape.render({
             "farmer_id": farmer_id,
             "location": farmer.location,
             "soil_type": farmer.soil_type,
@@ -207,7 +263,7 @@ def comprehensive_analysis(farmer_id: int, db: Session = Depends(get_db)):
                 "overall_risk_score": calculate_overall_risk(weather_pred, disease_risk),
                 "farming_suggestions": generate_farming_suggestions(weather_pred, crop_recommendations)
             }
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Comprehensive analysis error: {str(e)}")
@@ -1,11 +1,19 @@
+from typing import Any, Dict, List
+
 from app import database, models, schemas
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from app.imports import CROP_IMPORT, bulk_import, read_csv_rows
+from app.pagination import PageParams, paginate
+from app.read_models import sync_listing_details
+from app.serialization import rows_response
+from fastapi import (APIRouter, Body, Depends, File, HTTPException, Response,
+                     UploadFile)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(tags=["Crops"])  # REMOVED prefix here
 
 @router.post("/", response_model=schemas.CropOut)     
-def add_crop(crop: schemas.CropCreate, db: Session = Depends(database.get_db)):
+async def add_crop(crop: schemas.CropCreate, db: AsyncSession = Depends(database.get_async_db)):
     db_crop = models.Crop(
         name=crop.name,
         soil_type=crop.soil_type,
@@ -15,8 +23,8 @@ def add_crop(crop: schemas.CropCreate, db: Session = Depends(database.get_db)):
         status="Healthy"
     )
     db.add(db_crop)
-    db.commit()
-    db.refresh(db_crop)
+    await db.commit()
+    await db.refresh(db_crop)
     return schemas.CropOut(
         id=db_crop.id,
         name=db_crop.name,
@@ -27,23 +35,16 @@ def add_crop(crop: schemas.CropCreate, db: Session = Depends(database.get_db)):
     )
 
 @router.get("/", response_model=list[schemas.CropOut])
-def get_all_crops(db: Session = Depends(database.get_db)):
-    crops = db.query(models.Crop).all()
-    crop_list = []
-    for crop in crops:
-        crop_list.append(schemas.CropOut(
-            id=crop.id,
-            name=crop.name,
-            soil_type=crop.soil_type,
-            season=crop.season,
-            price_per_kg=crop.price,
-            farmer_id=crop.farmer_id
-        ))
-    return crop_list
+async def get_all_crops(response: Response, page: PageParams = Depends(),
+                        db: AsyncSession = Depends(database.get_async_db)):
+    c = models.Crop
+    query = select(c.id, c.name, c.soil_type, c.season, c.price.label("price_per_kg"), c.farmer_id)
+    crops = await paginate(db, query, c.id, page, response, count_table=c.__table__, columns=True)
+    return rows_response(crops, response)
 
 @router.get("/{crop_id}", response_model=schemas.CropOut)
-def get_crop(crop_id: int, db: Session = Depends(database.get_db)):
-    crop = db.query(models.Crop).filter(models.Crop.id == crop_id).first()
+async def get_crop(crop_id: int, db: AsyncSession = Depends(database.get_async_db)):
+    crop = await db.get(models.Crop, crop_id)
     if not crop:
         raise HTTPException(status_code=404, detail="Crop not found")
     return schemas.CropOut(
@@ -56,8 +57,8 @@ def get_crop(crop_id: int, db: Session = Depends(database.get_db)):
     )
 
 @router.put("/{crop_id}", response_model=schemas.CropOut)
-def update_crop(crop_id: int, updated_crop: schemas.CropCreate, db: Session = Depends(database.get_db)):    
-    crop = db.query(models.Crop).filter(models.Crop.id == crop_id).first()
+async def update_crop(crop_id: int, updated_crop: schemas.CropCreate, db: AsyncSession = Depends(database.get_async_db)):    
+    crop = await db.get(models.Crop, crop_id)
     if not crop:
         raise HTTPException(status_code=404, detail="Crop not found")
 
@@ -66,8 +67,10 @@ def update_crop(crop_id: int, updated_crop: schemas.CropCreate, db: Session = De
     crop.price = updated_crop.price_per_kg
     crop.season = updated_crop.season
 
-    db.commit()
-    db.refresh(crop)
+    await db.flush()
+    await sync_listing_details(db, crop_ids=[crop_id])
+    await db.commit()
+    await db.refresh(crop)
     return schemas.CropOut(
         id=crop.id,
         name=crop.name,
@@ -78,10 +81,22 @@ def update_crop(crop_id: int, updated_crop: schemas.CropCreate, db: Session = De
     )
 
 @router.delete("/{crop_id}")
-def delete_crop(crop_id: int, db: Session = Depends(database.get_db)):
-    crop = db.query(models.Crop).filter(models.Crop.id == crop_id).first()
+async def delete_crop(crop_id: int, db: AsyncSession = Depends(database.get_async_db)):
+    crop = await db.get(models.Crop, crop_id)
     if not crop:
         raise HTTPException(status_code=404, detail="Crop not found")
-    db.delete(crop)
-    db.commit()
-    return {"message": "Crop deleted successfully"}
\ No newline at end of file
+    await db.delete(crop)
+    await db.flush()
+    await sync_listing_details(db, crop_ids=[crop_id])
+    await db.commit()
+    return {"message": "Crop deleted successfully"}
+
+# BULK import - JSON array; rows that fail validation are reported, the rest are inserted
+@router.post("/bulk")
+async def bulk_create_crops(records: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(database.get_async_db)):
+    return await bulk_import(db, CROP_IMPORT, records)
+
+# BULK import - CSV upload with a header row matching the create fields
+@router.post("/bulk/csv")
+async def bulk_create_crops_csv(file: UploadFile = File(...), db: AsyncSession = Depends(database.get_async_db)):
+    return await bulk_import(db, CROP_IMPORT, await read_csv_rows(file))
@@ -1,37 +1,55 @@
-from typing import List
+from typing import Any, Dict, List
 
 from app import models, schemas
-from app.database import get_db
+from app.database import get_async_db
+from app.imports import FARMER_IMPORT, bulk_import, read_csv_rows
+from app.jobs.recommendations import materialized_recommendations_query
 from app.ml.crop_recommendation import crop_recommender
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from app.pagination import PageParams, paginate
+from app.serialization import json_response, row_dicts
+from fastapi import (APIRouter, Body, Depends, File, HTTPException, Response,
+                     UploadFile)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 router = APIRouter()
 
+def _crops_grown(farmer: models.Farmer) -> List[str]:
+    # Distinct crop names in the order they were added
+    return list(dict.fromkeys(crop.name for crop in farmer.crops))
+
 # READ all farmers - MUST COME BEFORE /{farmer_id}
 @router.get("/all", response_model=List[schemas.FarmerOut])
-def get_all_farmers(db: Session = Depends(get_db)):
-    farmers = db.query(models.Farmer).all()
-    farmer_list = []
-    for farmer in farmers:
-        farmer_list.append(schemas.FarmerOut(
-            id=farmer.id,
-            name=farmer.name,
-            location=farmer.location,
-            soil_type=farmer.soil_type,
-            contact=farmer.contact,
-            phone="",
-            crops_grown=[]
-        ))
-    return farmer_list
+async def get_all_farmers(response: Response, page: PageParams = Depends(),
+                          db: AsyncSession = Depends(get_async_db)):
+    f = models.Farmer
+    query = select(f.id, f.name, f.location, f.soil_type, f.contact)
+    farmers = await paginate(db, query, f.id, page, response, count_table=f.__table__, columns=True)
+
+    # One extra IN query loads the crop names of the whole page
+    farmer_list = row_dicts(farmers)
+    crops_grown = {farmer["id"]: {} for farmer in farmer_list}
+    if crops_grown:
+        crop_rows = await db.execute(
+            select(models.Crop.farmer_id, models.Crop.name)
+            .where(models.Crop.farmer_id.in_(list(crops_grown))).order_by(models.Crop.id)
+        )
+        for farmer_id, name in crop_rows:
+            crops_grown[farmer_id][name] = None
+
+    for farmer in farmer_list:
+        farmer["phone"] = ""
+        farmer["crops_grown"] = list(crops_grown[farmer["id"]])
+    return json_response(farmer_list, response)
 
 # CREATE farmer
 @router.post("/", response_model=schemas.FarmerOut)
-def create_farmer(farmer: schemas.FarmerCreate, db: Session = Depends(get_db)):
+async def create_farmer(farmer: schemas.FarmerCreate, db: AsyncSession = Depends(get_async_db)):
     new_farmer = models.Farmer(**farmer.dict())
     db.add(new_farmer)
-    db.commit()
-    db.refresh(new_farmer)
+    await db.commit()
+    await db.refresh(new_farmer)
     return schemas.FarmerOut(
         id=new_farmer.id,
         name=new_farmer.name,
@@ -44,8 +62,8 @@ def create_farmer(farmer: schemas.FarmerCreate, db: Session = Depends(get_db)):
 
 # READ single farmer
 @router.get("/{farmer_id}", response_model=schemas.FarmerOut)
-def get_farmer(farmer_id: int, db: Session = Depends(get_db)):
-    farmer = db.query(models.Farmer).filter(models.Farmer.id == farmer_id).first()
+async def get_farmer(farmer_id: int, db: AsyncSession = Depends(get_async_db)):
+    farmer = await db.get(models.Farmer, farmer_id, options=[selectinload(models.Farmer.crops)])
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
     return schemas.FarmerOut(
@@ -55,33 +73,40 @@ def get_farmer(farmer_id: int, db: Session = Depends(get_db)):
         soil_type=farmer.soil_type,
         contact=farmer.contact,
         phone="",
-        crops_grown=[]
+        crops_grown=_crops_grown(farmer)
     )
 
 # DELETE farmer
 @router.delete("/{farmer_id}")
-def delete_farmer(farmer_id: int, db: Session = Depends(get_db)):
-    farmer = db.query(models.Farmer).filter(models.Farmer.id == farmer_id).first()
+async def delete_farmer(farmer_id: int, db: AsyncSession = Depends(get_async_db)):
+    farmer = await db.get(models.Farmer, farmer_id)
     if not farmer:
         raise HTTPException(status_code=404, detail="Farmer not found")
-    db.delete(farmer)
-    db.commit()
+    await db.delete(farmer)
+    await db.commit()
     return {"message": "Farmer deleted successfully"}
 
 # CROP SUGGESTIONS
 @router.get("/{farmer_id}/recommendations")
-def get_crop_recommendations(farmer_id: int, db: Session = Depends(get_db)):
-    farmer = db.query(models.Farmer).filter(models.Farmer.id == farmer_id).first()
-    if not farmer:
+async def get_crop_recommendations(farmer_id: int, db: AsyncSession = Depends(get_async_db)):
+    row = (await db.execute(materialized_recommendations_query(farmer_id))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Farmer not found")
+    farmer, stored = row
 
-    recommendations = crop_recommender.recommend_crops(
-        location=farmer.location,
-        soil_type=farmer.soil_type,
-        previous_crops=[],
-        budget=10000,
-        farm_size=1.0
-    )
+    # Served from the nightly batch unless it predates a season or soil type change
+    # (the job stores the soil type normalized, as it keys its computations)
+    if (stored and stored.season == crop_recommender.get_current_season(farmer.location)
+            and stored.soil_type == (farmer.soil_type or "").strip().lower()):
+        recommendations = stored.recommendations
+    else:
+        recommendations = crop_recommender.recommend_crops(
+            location=farmer.location,
+            soil_type=farmer.soil_type,
+            previous_crops=[],
+            budget=10000,
+            farm_size=1.0
+        )
 
     return {
         "farmer_id": farmer.id,
@@ -90,5 +115,13 @@ def get_crop_recommendations(farmer_id: int, db: Session = Depends(get_db)):
         "soil_type": farmer.soil_type,
         "recommended_crops": recommendations
     }
-    
-    
\ No newline at end of file
+
+# BULK import - JSON array; rows that fail validation are reported, the rest are inserted
+@router.post("/bulk")
+async def bulk_create_farmers(records: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await bulk_import(db, FARMER_IMPORT, records)
+
+# BULK import - CSV upload with a header row matching the create fields
+@router.post("/bulk/csv")
+async def bulk_create_farmers_csv(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    return await bulk_import(db, FARMER_IMPORT, await read_csv_rows(file))
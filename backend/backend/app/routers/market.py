@@ -1,81 +1,129 @@
-import random
-from typing import List
+from typing import Any, Dict, List
 
 from app import models, schemas
-from app.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from app.counters import interest_counter
+from app.database import get_async_db
+from app.exports import export_response
+from app.imports import LISTING_IMPORT, bulk_import, read_csv_rows
+from app.pagination import PageParams, paginate
+from app.read_models import (get_listing_details, remove_listing_details,
+                              sync_listing_details)
+from app.search import search_listings
+from fastapi import (APIRouter, Body, Depends, File, HTTPException, Response,
+                     UploadFile)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
+def _detail_out(detail: models.MarketListingDetail) -> schemas.MarketListingDetailOut:
+    return schemas.MarketListingDetailOut(
+        id=detail.listing_id,
+        crop_id=detail.crop_id,
+        vendor_id=detail.vendor_id,
+        price=detail.price,
+        quantity=detail.quantity,
+        timestamp=detail.timestamp,
+        crop_name=detail.crop_name,
+        vendor_name=detail.vendor_name,
+        vendor_location=detail.vendor_location,
+        vendor_contact=detail.vendor_contact
+    )
+
 @router.post("/listings", response_model=schemas.MarketListingOut)
-def create_listing(listing: schemas.MarketListingCreate, db: Session = Depends(get_db)):
+async def create_listing(listing: schemas.MarketListingCreate, db: AsyncSession = Depends(get_async_db)):
     new_listing = models.MarketListing(**listing.dict())
     db.add(new_listing)
-    db.commit()
-    db.refresh(new_listing)
+    await db.flush()
+    await sync_listing_details(db, listing_ids=[new_listing.id])
+    await db.commit()
+    await db.refresh(new_listing)
     return new_listing
 
-@router.get("/listings", response_model=list[schemas.MarketListingOut])
-def get_all_listings(db: Session = Depends(get_db)):
-    return db.query(models.MarketListing).all()
+@router.get("/listings", response_model=list[schemas.MarketListingDetailOut])
+async def get_all_listings(response: Response, page: PageParams = Depends(),
+                           db: AsyncSession = Depends(get_async_db)):
+    # Newest first from the read model: crop and vendor fields come with the listing
+    details = await paginate(db, select(models.MarketListingDetail), models.MarketListingDetail.listing_id,
+                             page, response, descending=True, count_table=models.MarketListing.__table__)
+    return [_detail_out(detail) for detail in details]
+
+@router.get("/listings/export")
+async def export_listings(format: str = "ndjson", crop_id: int = None, vendor_id: int = None):
+    m = models.MarketListing
+    query = select(m.id, m.crop_id, m.vendor_id, m.price, m.quantity, m.timestamp).order_by(m.id)
+    if crop_id is not None:
+        query = query.where(m.crop_id == crop_id)
+    if vendor_id is not None:
+        query = query.where(m.vendor_id == vendor_id)
+    return export_response(query, format, "market_listings")
 
 @router.delete("/{listing_id}")
-def delete_listing(listing_id: int, db: Session = Depends(get_db)):
-    listing = db.query(models.MarketListing).filter(models.MarketListing.id == listing_id).first()
+async def delete_listing(listing_id: int, db: AsyncSession = Depends(get_async_db)):
+    listing = await db.get(models.MarketListing, listing_id)
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    db.delete(listing)
-    db.commit()
+    await remove_listing_details(db, [listing_id])
+    await db.delete(listing)
+    await db.commit()
     return {"message": "Listing deleted successfully"}
 
-@router.get("/listings/enhanced", response_model=List[schemas.MarketListingOut])
-def get_enhanced_listings(
+@router.get("/listings/enhanced", response_model=List[schemas.MarketListingDetailOut])
+async def get_enhanced_listings(
+    response: Response,
     location: str = None,
     crop_type: str = None,
     min_price: float = None,
     max_price: float = None,
-    db: Session = Depends(get_db)
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(models.MarketListing)
-    
-    if location:
-        query = query.join(models.Vendor).filter(models.Vendor.location.ilike(f"%{location}%"))
-    
-    if crop_type:
-        query = query.join(models.Crop).filter(models.Crop.name.ilike(f"%{crop_type}%"))
-    
-    if min_price is not None:
-        query = query.filter(models.MarketListing.price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(models.MarketListing.price <= max_price)
-    
-    return query.all()
+    # Text filters are index-backed and ranked by relevance (see app/search.py)
+    listings = await search_listings(db, page, response, location, crop_type, min_price, max_price)
+    details = await get_listing_details(db, [listing.id for listing in listings])
+    return [_detail_out(detail) for detail in details]
+
+@router.get("/listings/{listing_id}", response_model=schemas.MarketListingDetailOut)
+async def get_listing(listing_id: int, db: AsyncSession = Depends(get_async_db)):
+    detail = await db.get(models.MarketListingDetail, listing_id)
+    if not detail:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    return _detail_out(detail)
 
 @router.post("/listings/{listing_id}/contact")
-def contact_seller(listing_id: int, message: str, db: Session = Depends(get_db)):
-    listing = db.query(models.MarketListing).filter(models.MarketListing.id == listing_id).first()
-    if not listing:
+async def contact_seller(listing_id: int, message: str, db: AsyncSession = Depends(get_async_db)):
+    detail = await db.get(models.MarketListingDetail, listing_id)
+    if not detail:
         raise HTTPException(status_code=404, detail="Listing not found")
     
     return {
         "message": "Contact request sent successfully",
         "listing_id": listing_id,
-        "vendor_contact": listing.vendor.contact,
+        "vendor_contact": detail.vendor_contact,
         "your_message": message
     }
 
 @router.post("/listings/{listing_id}/interest")
-def express_interest(listing_id: int, db: Session = Depends(get_db)):
-    listing = db.query(models.MarketListing).filter(models.MarketListing.id == listing_id).first()
-    if not listing:
+async def express_interest(listing_id: int, db: AsyncSession = Depends(get_async_db)):
+    detail = await db.get(models.MarketListingDetail, listing_id)
+    if not detail:
         raise HTTPException(status_code=404, detail="Listing not found")
     
+    interest_counter.increment(listing_id)
     return {
         "message": "Interest recorded successfully",
         "listing_id": listing_id,
-        "crop": listing.crop.name,
-        "vendor": listing.vendor.name,
-        "interest_count": random.randint(1, 50)
-    }
\ No newline at end of file
+        "crop": detail.crop_name,
+        "vendor": detail.vendor_name,
+        "interest_count": await interest_counter.count(db, listing_id)
+    }
+
+# BULK import - JSON array; rows that fail validation are reported, the rest are inserted
+@router.post("/listings/bulk")
+async def bulk_create_listings(records: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await bulk_import(db, LISTING_IMPORT, records)
+
+# BULK import - CSV upload with a header row matching the create fields
+@router.post("/listings/bulk/csv")
+async def bulk_create_listings_csv(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    return await bulk_import(db, LISTING_IMPORT, await read_csv_rows(file))
@@ -1,72 +1,161 @@
-from typing import List
+from typing import List, Optional
 
 from app import database, models, schemas
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from app.jobs.notification_fanout import FanoutJob, get_fanout_job, start_fanout
+from app.notifications import (adjust_unread_counts, notification_broker,
+                               notification_payload, notification_stream,
+                               unread_cache)
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
+async def _publish_unread_count(db: AsyncSession, user_id: int):
+    counter = await db.get(models.UnreadNotificationCount, user_id, populate_existing=True)
+    count = max(counter.unread_count, 0) if counter else 0
+    unread_cache.set(user_id, count)
+    notification_broker.publish(user_id, "unread_count", {"unread_count": count})
+
 @router.get("/", response_model=List[schemas.NotificationOut])
-def get_notifications(user_id: int, db: Session = Depends(database.get_db)):
+async def get_notifications(user_id: int, db: AsyncSession = Depends(database.get_async_db)):
     try:
-        notifications = db.query(models.Notification).filter(
-            models.Notification.user_id == user_id
-        ).order_by(models.Notification.created_at.desc()).limit(20).all()
+        notifications = (await db.execute(
+            select(models.Notification).where(
+                models.Notification.user_id == user_id
+            ).order_by(models.Notification.created_at.desc()).limit(20)
+        )).scalars().all()
         return notifications
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching notifications: {str(e)}")
 
+@router.post("/", response_model=schemas.NotificationOut)
+async def create_notification(notification: schemas.NotificationCreate, db: AsyncSession = Depends(database.get_async_db)):
+    try:
+        new_notification = models.Notification(**notification.dict(), is_read=False)
+        db.add(new_notification)
+        await adjust_unread_counts(db, {notification.user_id: 1})
+        await db.commit()
+        await db.refresh(new_notification)
+        unread_cache.invalidate([notification.user_id])
+        notification_broker.publish(notification.user_id, "notification",
+                                    notification_payload(new_notification), new_notification.id)
+        return new_notification
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating notification: {str(e)}")
+
+@router.post("/broadcast", status_code=202)
+async def broadcast_notification(broadcast: schemas.NotificationBroadcast):
+    # Fan-out runs in the background; poll the job for progress
+    if broadcast.user_ids is None and not (broadcast.location or broadcast.user_type):
+        raise HTTPException(status_code=400, detail="Give user_ids, location or user_type as the target")
+    job = start_fanout(FanoutJob(**broadcast.dict()))
+    return job.progress()
+
+@router.get("/broadcast/{job_id}")
+async def get_broadcast_progress(job_id: str):
+    job = get_fanout_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Broadcast job not found")
+    return job.progress()
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    user_id: int,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    # Server-sent events; a reconnecting EventSource sends Last-Event-ID and gets what it missed,
+    # a fresh connection starts at the newest notification.
+    # The query parameter covers clients that cannot set headers
+    after = last_event_id
+    if after is None and last_event_id_header:
+        try:
+            after = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be a notification id")
+    return StreamingResponse(
+        notification_stream(request, user_id, after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/unread-count")
-def get_unread_count(user_id: int, db: Session = Depends(database.get_db)):
+async def get_unread_count(user_id: int, db: AsyncSession = Depends(database.get_async_db)):
     try:
-        count = db.query(models.Notification).filter(
-            models.Notification.user_id == user_id,
-            models.Notification.is_read == False
-        ).count()
+        # Maintained counter (plus a short per-worker cache) instead of COUNT(*) per poll
+        count = unread_cache.get(user_id)
+        if count is None:
+            counter = await db.get(models.UnreadNotificationCount, user_id)
+            count = max(counter.unread_count, 0) if counter else 0
+            unread_cache.set(user_id, count)
         return {"unread_count": count}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error counting unread notifications: {str(e)}")
 
 @router.post("/mark-read/{notification_id}")
-def mark_as_read(notification_id: int, db: Session = Depends(database.get_db)):
+async def mark_as_read(notification_id: int, db: AsyncSession = Depends(database.get_async_db)):
     try:
-        notification = db.query(models.Notification).filter(
-            models.Notification.id == notification_id
-        ).first()
-        
-        if not notification:
-            raise HTTPException(status_code=404, detail="Notification not found")
-        
-        notification.is_read = True
-        db.commit()
+        # Only an actual unread -> read transition moves the counter
+        user_id = (await db.execute(
+            update(models.Notification).where(
+                models.Notification.id == notification_id,
+                models.Notification.is_read == False
+            ).values(is_read=True).returning(models.Notification.user_id)
+        )).scalar()
+
+        if user_id is None:
+            if not await db.get(models.Notification, notification_id):
+                raise HTTPException(status_code=404, detail="Notification not found")
+            return {"message": "Notification marked as read"}
+
+        await adjust_unread_counts(db, {user_id: -1})
+        await db.commit()
+        await _publish_unread_count(db, user_id)
         return {"message": "Notification marked as read"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error marking notification as read: {str(e)}")
 
 @router.post("/mark-all-read")
-def mark_all_as_read(user_id: int, db: Session = Depends(database.get_db)):
+async def mark_all_as_read(user_id: int, db: AsyncSession = Depends(database.get_async_db)):
     try:
-        db.query(models.Notification).filter(
-            models.Notification.user_id == user_id,
-            models.Notification.is_read == False
-        ).update({"is_read": True})
-        db.commit()
+        result = await db.execute(
+            update(models.Notification).where(
+                models.Notification.user_id == user_id,
+                models.Notification.is_read == False
+            ).values(is_read=True)
+        )
+        await adjust_unread_counts(db, {user_id: -result.rowcount})
+        await db.commit()
+        await _publish_unread_count(db, user_id)
         return {"message": "All notifications marked as read"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error marking all notifications as read: {str(e)}")
 
 @router.delete("/{notification_id}")
-def delete_notification(notification_id: int, db: Session = Depends(database.get_db)):
+async def delete_notification(notification_id: int, db: AsyncSession = Depends(database.get_async_db)):
     try:
-        notification = db.query(models.Notification).filter(
-            models.Notification.id == notification_id
-        ).first()
-        
-        if not notification:
+        # The deleted row's own is_read decides the counter, so a concurrent mark-read
+        # can't have both paths subtract
+        deleted = (await db.execute(
+            delete(models.Notification).where(models.Notification.id == notification_id)
+            .returning(models.Notification.user_id, models.Notification.is_read)
+        )).first()
+
+        if not deleted:
             raise HTTPException(status_code=404, detail="Notification not found")
-        
-        db.delete(notification)
-        db.commit()
+
+        user_id, is_read = deleted
+        if not is_read:
+            await adjust_unread_counts(db, {user_id: -1})
+        await db.commit()
+        await _publish_unread_count(db, user_id)
         return {"message": "Notification deleted"}
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deleting notification: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error deleting notification: {str(e)}")
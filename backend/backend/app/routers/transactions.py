@@ -1,45 +1,137 @@
+from datetime import date, datetime
+from typing import Any, Dict, List
+
 from app import models, schemas
-from app.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from app.database import get_async_db
+from app.exports import export_response
+from app.imports import (ingest_transactions, insert_transactions, transaction_reference_errors,
+                         transaction_row)
+from app.pagination import PageParams, paginate
+from app.rollups import (ROLLUP_DIMENSIONS, SERIES_INTERVALS,
+                         apply_transaction_rollups, lock_rollups_for_write,
+                         rollup_series, rollup_totals)
+from app.serialization import rows_response
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.TransactionOut)
-def create_transaction(txn: schemas.TransactionCreate, db: Session = Depends(get_db)):
-    db_txn = models.Transaction(**txn.dict())
-    db.add(db_txn)
-    db.commit()
-    db.refresh(db_txn)
+async def create_transaction(txn: schemas.TransactionCreate, db: AsyncSession = Depends(get_async_db)):
+    # Same reference checks as /batch, so a bad id is a 400 rather than a foreign key error
+    error = (await transaction_reference_errors(db, [transaction_row(txn)]))[0]
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    if txn.idempotency_key:
+        # A retry with the same key returns the stored transaction instead of a second one
+        await insert_transactions(db, [transaction_row(txn)])
+        await db.commit()
+        db_txn = (await db.execute(
+            select(models.Transaction).where(models.Transaction.idempotency_key == txn.idempotency_key)
+        )).scalar_one()
+    else:
+        db_txn = models.Transaction(
+            farmer_id=txn.farmer_id,
+            vendor_id=txn.vendor_id,
+            crop_id=txn.crop_id,
+            amount=txn.total_price
+        )
+        await lock_rollups_for_write(db)
+        db.add(db_txn)
+        await db.flush()
+        await apply_transaction_rollups(db, [db_txn])
+        await db.commit()
+        await db.refresh(db_txn)
     return schemas.TransactionOut(
         id=db_txn.id,
         farmer_id=db_txn.farmer_id,
         vendor_id=db_txn.vendor_id,
         crop_id=db_txn.crop_id,
         quantity=txn.quantity,
-        total_price=txn.total_price
+        total_price=db_txn.amount or 0.0
     )
 
+# BATCH sync - keyed transactions in one insert and one commit, with a result per item
+@router.post("/batch")
+async def create_transactions_batch(records: List[Dict[str, Any]] = Body(...),
+                                    db: AsyncSession = Depends(get_async_db)):
+    return await ingest_transactions(db, records)
+
 @router.get("/", response_model=list[schemas.TransactionOut])
-def get_transactions(db: Session = Depends(get_db)):
-    transactions = db.query(models.Transaction).all()
-    transaction_list = []
-    for txn in transactions:
-        transaction_list.append(schemas.TransactionOut(
-            id=txn.id,
-            farmer_id=txn.farmer_id,
-            vendor_id=txn.vendor_id,
-            crop_id=txn.crop_id,
-            quantity=txn.quantity or 0.0,
-            total_price=txn.amount or 0.0
-        ))
-    return transaction_list
+async def get_transactions(response: Response, page: PageParams = Depends(),
+                           db: AsyncSession = Depends(get_async_db)):
+    # Newest first
+    t = models.Transaction
+    query = select(t.id, t.farmer_id, t.vendor_id, t.crop_id, literal(0.0).label("quantity"),
+                   func.coalesce(t.amount, 0.0).label("total_price"))
+    transactions = await paginate(db, query, t.id, page, response, descending=True,
+                                  count_table=t.__table__, columns=True)
+    return rows_response(transactions, response)
+
+@router.get("/export")
+async def export_transactions(
+    format: str = "ndjson",
+    farmer_id: int = None,
+    vendor_id: int = None,
+    since: datetime = None,
+    until: datetime = None
+):
+    t = models.Transaction
+    query = select(t.id, t.farmer_id, t.vendor_id, t.crop_id, t.amount, t.date, t.notes).order_by(t.id)
+    if farmer_id is not None:
+        query = query.where(t.farmer_id == farmer_id)
+    if vendor_id is not None:
+        query = query.where(t.vendor_id == vendor_id)
+    if since is not None:
+        query = query.where(t.date >= since)
+    if until is not None:
+        query = query.where(t.date < until)
+    return export_response(query, format, "transactions")
+
+def _check_dimension(dimension: str):
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of: {', '.join(ROLLUP_DIMENSIONS)}")
+
+# Totals and time series read the daily rollups, never the raw transactions.
+# Ranges are whole days: since inclusive, until exclusive
+@router.get("/rollups/totals", response_model=List[schemas.TransactionTotalOut])
+async def get_transaction_totals(
+    dimension: str = "all",
+    key_id: int = None,
+    since: date = None,
+    until: date = None,
+    limit: int = Query(20, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    _check_dimension(dimension)
+    return await rollup_totals(db, dimension, key_id, since, until, limit)
+
+@router.get("/rollups/series", response_model=List[schemas.TransactionRollupOut])
+async def get_transaction_series(
+    dimension: str = "all",
+    key_id: int = None,
+    since: date = None,
+    until: date = None,
+    interval: str = "day",
+    db: AsyncSession = Depends(get_async_db)
+):
+    _check_dimension(dimension)
+    if interval not in SERIES_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of: {', '.join(SERIES_INTERVALS)}")
+    if dimension == "all":
+        key_id = 0
+    elif key_id is None:
+        raise HTTPException(status_code=400, detail=f"key_id is required for the {dimension} series")
+    return await rollup_series(db, dimension, key_id, since, until, interval)
 
 @router.delete("/{txn_id}")
-def delete_transaction(txn_id: int, db: Session = Depends(get_db)):
-    txn = db.query(models.Transaction).filter(models.Transaction.id == txn_id).first()
+async def delete_transaction(txn_id: int, db: AsyncSession = Depends(get_async_db)):
+    txn = await db.get(models.Transaction, txn_id)
     if not txn:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    db.delete(txn)
-    db.commit()
+    await lock_rollups_for_write(db, deleting=True)
+    await apply_transaction_rollups(db, [txn], sign=-1)
+    await db.delete(txn)
+    await db.commit()
     return {"message": "Transaction deleted successfully"}
\ No newline at end of file
@@ -1,26 +1,29 @@
+from typing import Any, Dict, List
+
 from app import models, schemas
-from app.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from app.database import get_async_db
+from app.imports import VENDOR_IMPORT, bulk_import, read_csv_rows
+from app.pagination import PageParams, paginate
+from app.read_models import sync_listing_details
+from app.serialization import rows_response
+from fastapi import (APIRouter, Body, Depends, File, HTTPException, Response,
+                     UploadFile)
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 @router.get("/all", response_model=list[schemas.VendorOut])
-def get_all_vendors(db: Session = Depends(get_db)):
-    vendors = db.query(models.Vendor).all()
-    vendor_list = []
-    for vendor in vendors:
-        vendor_list.append(schemas.VendorOut(
-            id=vendor.id,
-            name=vendor.name,
-            shop_name=vendor.product_type or "",
-            location=vendor.location or "",
-            contact=vendor.contact
-        ))
-    return vendor_list
+async def get_all_vendors(response: Response, page: PageParams = Depends(),
+                          db: AsyncSession = Depends(get_async_db)):
+    v = models.Vendor
+    query = select(v.id, v.name, func.coalesce(v.product_type, "").label("shop_name"),
+                   func.coalesce(v.location, "").label("location"), v.contact)
+    vendors = await paginate(db, query, v.id, page, response, count_table=v.__table__, columns=True)
+    return rows_response(vendors, response)
 
 @router.post("/", response_model=schemas.VendorOut)
-def create_vendor(vendor: schemas.VendorCreate, db: Session = Depends(get_db)):
+async def create_vendor(vendor: schemas.VendorCreate, db: AsyncSession = Depends(get_async_db)):
     new_vendor = models.Vendor(
         name=vendor.name,
         product_type=vendor.shop_name,
@@ -28,8 +31,8 @@ def create_vendor(vendor: schemas.VendorCreate, db: Session = Depends(get_db)):
         contact=vendor.contact
     )
     db.add(new_vendor)
-    db.commit()
-    db.refresh(new_vendor)
+    await db.commit()
+    await db.refresh(new_vendor)
     return schemas.VendorOut(
         id=new_vendor.id,
         name=new_vendor.name,
@@ -39,8 +42,8 @@ def create_vendor(vendor: schemas.VendorCreate, db: Session = Depends(get_db)):
     )
 
 @router.get("/{vendor_id}", response_model=schemas.VendorOut)
-def get_vendor(vendor_id: int, db: Session = Depends(get_db)):
-    vendor = db.query(models.Vendor).filter(models.Vendor.id == vendor_id).first()
+async def get_vendor(vendor_id: int, db: AsyncSession = Depends(get_async_db)):
+    vendor = await db.get(models.Vendor, vendor_id)
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
     return schemas.VendorOut(
@@ -52,10 +55,22 @@ def get_vendor(vendor_id: int, db: Session = Depends(get_db)):
     )
 
 @router.delete("/{vendor_id}")
-def delete_vendor(vendor_id: int, db: Session = Depends(get_db)):
-    vendor = db.query(models.Vendor).filter(models.Vendor.id == vendor_id).first()
+async def delete_vendor(vendor_id: int, db: AsyncSession = Depends(get_async_db)):
+    vendor = await db.get(models.Vendor, vendor_id)
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
-    db.delete(vendor)
-    db.commit()
-    return {"message": "Vendor deleted successfully"}
\ No newline at end of file
+    await db.delete(vendor)
+    await db.flush()
+    await sync_listing_details(db, vendor_ids=[vendor_id])
+    await db.commit()
+    return {"message": "Vendor deleted successfully"}
+
+# BULK import - JSON array; rows that fail validation are reported, the rest are inserted
+@router.post("/bulk")
+async def bulk_create_vendors(records: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    return await bulk_import(db, VENDOR_IMPORT, records)
+
+# BULK import - CSV upload with a header row matching the create fields
+@router.post("/bulk/csv")
+async def bulk_create_vendors_csv(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    return await bulk_import(db, VENDOR_IMPORT, await read_csv_rows(file))
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, List, Optional
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 
 # ---------------------- AUTH ----------------------
@@ -103,6 +103,12 @@ class MarketListingOut(BaseModel):
     
     model_config = ConfigDict(from_attributes=True, extra='ignore')
 
+class MarketListingDetailOut(MarketListingOut):
+    crop_name: Optional[str] = None
+    vendor_name: Optional[str] = None
+    vendor_location: Optional[str] = None
+    vendor_contact: Optional[str] = None
+
 # ---------------------- ANALYTICS & ML ----------------------
 class PricePredictRequest(BaseModel):
     crop_name: str
@@ -141,7 +147,20 @@ class TransactionBase(BaseModel):
     total_price: float = 0.0
 
 class TransactionCreate(TransactionBase):
-    pass
+    # Client-generated; retrying a request with the same key never creates a second row
+    idempotency_key: Optional[str] = Field(None, min_length=1, max_length=128)
+
+class TransactionBatchItem(TransactionCreate):
+    idempotency_key: str = Field(..., min_length=1, max_length=128)
+    date: Optional[datetime] = None  # when the sale happened, for offline sync
+
+    @field_validator("date")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # transactions.date is a naive UTC column; asyncpg rejects offset-aware values
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
 
 class TransactionOut(BaseModel):
     id: int
@@ -153,6 +172,16 @@ class TransactionOut(BaseModel):
     
     model_config = ConfigDict(from_attributes=True, extra='ignore')
 
+class TransactionRollupOut(BaseModel):
+    period: str
+    transaction_count: int = 0
+    total_amount: float = 0.0
+
+class TransactionTotalOut(BaseModel):
+    key_id: int
+    transaction_count: int = 0
+    total_amount: float = 0.0
+
 # ---------------------- NOTIFICATIONS ----------------------
 class NotificationBase(BaseModel):
     title: str
@@ -162,6 +191,12 @@ class NotificationBase(BaseModel):
 class NotificationCreate(NotificationBase):
     user_id: int
 
+class NotificationBroadcast(NotificationBase):
+    # Explicit recipients, or every user matching location / user_type
+    user_ids: Optional[List[int]] = None
+    location: Optional[str] = None
+    user_type: Optional[str] = None
+
 class NotificationOut(NotificationBase):
     id: int
     is_read: bool = False
@@ -0,0 +1,123 @@
+from itertools import product
+
+from app import models
+from app.pagination import (NEXT_CURSOR_HEADER, PageParams, decode_ranked_cursor,
+                            encode_cursor, paginate)
+from fastapi import Response
+from sqlalchemy import case, column, func, select, table, text
+
+# The FTS5 trigram tokenizer can only match terms of at least one full trigram
+FTS_MIN_TERM_LENGTH = 3
+# Match quality of a term within a field: exact, prefix, anywhere
+TIERS = (3, 2, 1)
+
+_fts_available = None
+
+
+def _escape_like(term: str) -> str:
+    """Escape %, _ and the backslash itself so user input matches literally in LIKE ... ESCAPE '\\'"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def _has_fts(db) -> bool:
+    """Whether the SQLite FTS5 shadow tables from the listing-search migration exist"""
+    global _fts_available
+    if _fts_available is None:
+        found = (await db.execute(text(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN ('crops_fts', 'vendors_fts')"
+        ))).scalar()
+        _fts_available = found == 2
+    return _fts_available
+
+
+async def _text_match(db, target, fts_table: str, term: str):
+    """Filter for `target` containing `term`, served by a text index where there is one.
+
+    PostgreSQL answers ILIKE '%term%' from the pg_trgm GIN index; SQLite goes
+    through the FTS5 trigram table; anything else scans."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite" and len(term) >= FTS_MIN_TERM_LENGTH and await _has_fts(db):
+        fts = table(fts_table, column("rowid"))
+        phrase = '"' + term.replace('"', '""') + '"'
+        matches = select(fts.c.rowid).where(
+            text(f"{fts_table} MATCH :{fts_table}_term").bindparams(**{f"{fts_table}_term": phrase})
+        )
+        return target.table.c.id.in_(matches)
+    return target.ilike(f"%{_escape_like(term)}%", escape="\\")
+
+
+def _tier(target, term: str):
+    lowered = func.lower(target)
+    prefix = lowered.like(f"{_escape_like(term.lower())}%", escape="\\")
+    return case((lowered == term.lower(), 3), (prefix, 2), else_=1)
+
+
+async def search_listings(db, page: PageParams, response: Response, location: str = None,
+                          crop_type: str = None, min_price: float = None, max_price: float = None):
+    """Listings filtered by vendor location, crop name and price range.
+
+    Text matches are ranked by match quality, best first, then newest first.
+    Instead of scoring and sorting every matching listing, each combination of
+    tiers is a separate level: the matching crop/vendor ids are resolved on the
+    small tables and the level is read newest-first from the listing indexes,
+    stopping as soon as the page is full."""
+    location = (location or "").strip()
+    crop_type = (crop_type or "").strip()
+    listing = models.MarketListing
+
+    query = select(listing)
+    if min_price is not None:
+        query = query.where(listing.price >= min_price)
+    if max_price is not None:
+        query = query.where(listing.price <= max_price)
+
+    # (listing column, searched model, searched field, fts table, term)
+    filters = []
+    if crop_type:
+        filters.append((listing.crop_id, models.Crop, models.Crop.name, "crops_fts", crop_type))
+    if location:
+        filters.append((listing.vendor_id, models.Vendor, models.Vendor.location, "vendors_fts", location))
+
+    if not filters:
+        # A table-wide estimate would be misleading for a price-filtered result
+        filtered = min_price is not None or max_price is not None
+        return await paginate(db, query, listing.id, page, response, descending=True,
+                              count_table=None if filtered else listing.__table__)
+
+    matches = []
+    present = []  # tiers that actually occur for each term
+    for _, _, target, fts, term in filters:
+        match = await _text_match(db, target, fts, term)
+        tiers = set((await db.execute(select(_tier(target, term)).where(match).distinct())).scalars().all())
+        if not tiers:
+            return []
+        matches.append(match)
+        present.append(tiers)
+
+    # Best combined tier first; product() already yields each sum's combinations in a fixed order.
+    # Cursors refer to positions in this full list, so they survive tiers appearing between pages
+    levels = sorted(product(TIERS, repeat=len(filters)), key=lambda tiers: -sum(tiers))
+
+    after = decode_ranked_cursor(page.cursor)
+    start = after[0] if after else 0
+    found = []  # (level, listing)
+    for level in range(start, len(levels)):
+        if any(tier not in tiers for tier, tiers in zip(levels[level], present)):
+            continue
+        level_query = query
+        for (listing_column, model, target, _, term), match, tier in zip(filters, matches, levels[level]):
+            level_query = level_query.where(
+                listing_column.in_(select(model.id).where(match, _tier(target, term) == tier))
+            )
+        if after and level == after[0]:
+            level_query = level_query.where(listing.id < after[1])
+        level_query = level_query.order_by(listing.id.desc()).limit(page.limit + 1 - len(found))
+
+        found.extend((level, row) for row in (await db.execute(level_query)).scalars().all())
+        if len(found) > page.limit:
+            break
+
+    if len(found) > page.limit:
+        found = found[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(found[-1][1].id, found[-1][0])
+    return [row for _, row in found]
@@ -0,0 +1,193 @@
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "uploads"))
+UPLOAD_RETENTION_DAYS = float(os.getenv("UPLOAD_RETENTION_DAYS", "30"))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_MB", "512")) * 1024 * 1024
+THUMBNAIL_SIZE = int(os.getenv("UPLOAD_THUMBNAIL_SIZE", "256"))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("UPLOAD_SWEEP_INTERVAL", "300"))
+
+
+class UploadStorageManager:
+    """Stores uploaded photos, thumbnails them in the background and keeps
+    the upload directory within a retention window and a total-size quota."""
+
+    def __init__(self, root: Path = UPLOAD_DIR, retention_days: float = UPLOAD_RETENTION_DAYS,
+                 max_bytes: int = UPLOAD_MAX_BYTES, thumbnail_size: int = THUMBNAIL_SIZE,
+                 sweep_interval: float = SWEEP_INTERVAL_SECONDS):
+        self.root = Path(root)
+        self.originals_dir = self.root / "originals"
+        self.thumbnails_dir = self.root / "thumbnails"
+        self.retention_seconds = retention_days * 86400
+        self.max_bytes = max_bytes
+        self.thumbnail_size = (thumbnail_size, thumbnail_size)
+        self.sweep_interval = sweep_interval
+
+        self._lock = threading.Lock()
+        self._files: Dict[Path, Tuple[float, int]] = {}  # path -> (mtime, size)
+        self._total_bytes = 0
+        self._jobs: "queue.Queue[Optional[Path]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+        self.originals_dir.mkdir(parents=True, exist_ok=True)
+        self.thumbnails_dir.mkdir(parents=True, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Build the in-memory size index once so quota checks never walk the disk"""
+        with self._lock:
+            self._files.clear()
+            self._total_bytes = 0
+            for directory in (self.originals_dir, self.thumbnails_dir):
+                for path in directory.iterdir():
+                    if path.is_file():
+                        stat = path.stat()
+                        self._files[path] = (stat.st_mtime, stat.st_size)
+                        self._total_bytes += stat.st_size
+
+    def _track(self, path: Path):
+        stat = path.stat()
+        with self._lock:
+            previous = self._files.get(path)
+            if previous:
+                self._total_bytes -= previous[1]
+            self._files[path] = (stat.st_mtime, stat.st_size)
+            self._total_bytes += stat.st_size
+
+    def _remove(self, path: Path):
+        with self._lock:
+            entry = self._files.pop(path, None)
+            if entry:
+                self._total_bytes -= entry[1]
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _safe_name(crop_name: str, filename: str) -> str:
+        suffix = Path(filename or "").suffix.lower() or ".jpg"
+        crop = re.sub(r"[^a-z0-9]+", "-", (crop_name or "crop").lower()).strip("-") or "crop"
+        return f"{crop}_{uuid.uuid4().hex}{suffix}"
+
+    def save_upload(self, image_bytes: bytes, crop_name: str, filename: str) -> str:
+        """Persist an original upload and queue its thumbnail; returns the upload id"""
+        name = self._safe_name(crop_name, filename)
+        path = self.originals_dir / name
+        path.write_bytes(image_bytes)
+        self._track(path)
+        self._jobs.put(path)
+        return name
+
+    def thumbnail_path(self, upload_id: str) -> Path:
+        return self.thumbnails_dir / f"{Path(upload_id).stem}.jpg"
+
+    def get_thumbnail(self, upload_id: str) -> Optional[Path]:
+        """Return the thumbnail for an upload, generating it inline if the worker hasn't yet"""
+        if Path(upload_id).name != upload_id:
+            return None
+        thumbnail = self.thumbnail_path(upload_id)
+        if thumbnail.exists():
+            return thumbnail
+        original = self.originals_dir / upload_id
+        if original.exists():
+            return self._make_thumbnail(original)
+        return None
+
+    def _make_thumbnail(self, original: Path) -> Optional[Path]:
+        thumbnail = self.thumbnail_path(original.name)
+        try:
+            with Image.open(original) as image:
+                image.draft("RGB", self.thumbnail_size)
+                image = image.convert("RGB")
+                image.thumbnail(self.thumbnail_size)
+                image.save(thumbnail, "JPEG", quality=80, optimize=True)
+        except Exception as e:
+            print(f"❌ Thumbnail generation failed for {original.name}: {e}")
+            return None
+        self._track(thumbnail)
+        return thumbnail
+
+    def sweep(self) -> Dict[str, int]:
+        """Drop files past retention, then evict oldest-first until under quota"""
+        cutoff = time.time() - self.retention_seconds
+        expired = 0
+        evicted = 0
+
+        with self._lock:
+            ordered = sorted(self._files.items(), key=lambda item: item[1][0])
+
+        for path, (mtime, _) in ordered:
+            if mtime >= cutoff:
+                break
+            self._remove(path)
+            expired += 1
+
+        if self._total_bytes > self.max_bytes:
+            # Originals go first; thumbnails are what the dashboards actually read
+            with self._lock:
+                ordered = sorted(
+                    self._files.items(),
+                    key=lambda item: (item[0].parent != self.originals_dir, item[1][0])
+                )
+            for path, _ in ordered:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._remove(path)
+                evicted += 1
+
+        return {"expired": expired, "evicted": evicted, "total_bytes": self._total_bytes}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "pending_thumbnails": self._jobs.qsize(),
+            }
+
+    def _run(self):
+        next_sweep = time.monotonic()
+        while True:
+            timeout = max(0.0, next_sweep - time.monotonic())
+            try:
+                job = self._jobs.get(timeout=timeout)
+            except queue.Empty:
+                job = None
+            else:
+                if job is None:
+                    break
+                if job.exists():
+                    self._make_thumbnail(job)
+
+            if time.monotonic() >= next_sweep or self._total_bytes > self.max_bytes:
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"❌ Upload sweep error: {e}")
+                next_sweep = time.monotonic() + self.sweep_interval
+
+    def start(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._run, name="upload-storage", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        if self._worker and self._worker.is_alive():
+            self._jobs.put(None)
+            self._worker.join(timeout=5)
+        self._worker = None
+
+
+# Initialize the storage manager
+upload_storage = UploadStorageManager()
@@ -0,0 +1,78 @@
+"""Per-row cost of the list endpoint response paths on 100k rows.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.list_serialization [rows]
+
+(app.database needs a DATABASE_URL to import; the benchmark itself runs in memory.)
+
+Compares, on an in-memory SQLite database:
+  orm     select(Crop) -> CropOut per row -> response_model validation -> json
+  columns labeled column select -> Rows -> dicts -> orjson (app.serialization.rows_response)
+"""
+import json
+import sys
+import time
+
+from app import models, schemas
+from app.database import Base
+from app.serialization import orjson, rows_response
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _seed(session: Session, rows: int):
+    session.execute(insert(models.Farmer), [{"name": "farmer", "contact": "0"}])
+    session.execute(insert(models.Crop), [
+        {"name": f"crop {i}", "soil_type": "loam", "season": "Kharif", "price": i / 10, "farmer_id": 1}
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def orm_path(session: Session) -> bytes:
+    crops = session.execute(select(models.Crop)).scalars().all()
+    built = [
+        schemas.CropOut(id=crop.id, name=crop.name, soil_type=crop.soil_type, season=crop.season,
+                        price_per_kg=crop.price, farmer_id=crop.farmer_id)
+        for crop in crops
+    ]
+    # What FastAPI does with response_model: validate again, dump to JSON-able data, json.dumps
+    adapter = TypeAdapter(list[schemas.CropOut])
+    content = adapter.dump_python(adapter.validate_python(built), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def columns_path(session: Session) -> bytes:
+    c = models.Crop
+    rows = session.execute(
+        select(c.id, c.name, c.soil_type, c.season, c.price.label("price_per_kg"), c.farmer_id)
+    ).all()
+    return rows_response(rows).body
+
+
+def main(rows: int = 100_000, repeat: int = 3):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        _seed(session, rows)
+        print(f"{rows} rows, encoder: {'orjson' if orjson else 'json'}")
+        outputs = {}
+        for name, path in (("orm", orm_path), ("columns", columns_path)):
+            best = None
+            for _ in range(repeat):
+                session.expunge_all()
+                body, elapsed = _timed(lambda: path(session))
+                best = elapsed if best is None else min(best, elapsed)
+            outputs[name] = body
+            print(f"{name:>8}: {best * 1000:8.1f} ms total, {best / rows * 1e6:6.2f} us/row, {len(body)} bytes")
+        assert json.loads(outputs["orm"]) == json.loads(outputs["columns"]), "paths disagree"
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,38 +1,33 @@
-# clean_database.py
-import psycopg2
+# reset_db.py
+from alembic import command
+from sqlalchemy import inspect, text
+
 from app.database import engine
+from app.migrations import _alembic_config
 
 
 def clean_database():
-    # Connect to PostgreSQL
-    conn = psycopg2.connect(
-        host="localhost",
-        database="agrisetu",
-        user="postgres",
-        password="password"
-    )
-    conn.autocommit = True
-    cursor = conn.cursor()
-    
-    # Drop ALL tables to start fresh
-    tables_to_drop = [
-        'weather', 'users', 'farmers', 'vendors', 'crops', 'price_predictions',
-        'farmer', 'marketlisting', 'crop', 'transaction', 'vendor', 'pricehistory',
-        'crop_diseases', 'price_histories', 'market_listings', 'crop_suggestions',
-        'transactions', 'notifications', 'analytics_dashboards', 'system_logs',
-        'weather_alerts'
-    ]
-    
-    for table in tables_to_drop:
-        try:
-            cursor.execute(f"DROP TABLE IF EXISTS {table} CASCADE;")
-            print(f"✅ Dropped table: {table}")
-        except Exception as e:
-            print(f"❌ Could not drop {table}: {e}")
-    
-    cursor.close()
-    conn.close()
-    print("🎉 Database cleaned! All tables dropped.")
+    # Run every migration's downgrade, so migration-created tables, FTS triggers and
+    # trigram indexes go too and alembic_version no longer claims the schema is current
+    try:
+        command.downgrade(_alembic_config(), "base")
+        print("✅ Downgraded schema to base")
+    except Exception as e:
+        print(f"❌ Could not downgrade schema: {e}")
+
+    # Drop ALL remaining tables (created outside migrations) to start fresh
+    cascade = " CASCADE" if engine.dialect.name == "postgresql" else ""
+    with engine.connect() as connection:
+        for table in inspect(connection).get_table_names():
+            try:
+                connection.execute(text(f'DROP TABLE IF EXISTS "{table}"{cascade}'))
+                connection.commit()
+                print(f"✅ Dropped table: {table}")
+            except Exception as e:
+                connection.rollback()
+                print(f"❌ Could not drop {table}: {e}")
+
+    print("🎉 Database cleaned! All tables dropped; run `alembic upgrade head` to recreate them.")
 
 if __name__ == "__main__":
-    clean_database()
\ No newline at end of file
+    clean_database()
@@ -1,2 +1,3 @@
 #!/bin/bash
+alembic upgrade head
 uvicorn app.main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+# app.database builds its engines at import time, so point them at a throwaway SQLite file first
+_db_dir = tempfile.mkdtemp(prefix="agrisetu-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+import pytest  # noqa: E402
+from app import models  # noqa: E402,F401 - registers tables on Base.metadata
+from app.database import Base, SessionLocal, engine  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+    from fastapi.testclient import TestClient
+
+    # No context manager: startup (migration check, background threads) is not needed here
+    return TestClient(app)
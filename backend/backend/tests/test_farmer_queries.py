@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+
+import pytest
+from app import models
+from app.database import async_engine
+from sqlalchemy import event
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed_farmers(db, count: int, crops_per_farmer: int = 2):
+    farmers = [
+        models.Farmer(name=f"farmer {i}", location="Pune", soil_type="Loam", contact=str(i))
+        for i in range(count)
+    ]
+    db.add_all(farmers)
+    db.flush()
+    db.add_all(
+        models.Crop(name=f"crop {j}", soil_type="Loam", season="Rabi", price=1.0, farmer_id=farmer.id)
+        for farmer in farmers for j in range(crops_per_farmer)
+    )
+    db.commit()
+
+
+@pytest.mark.parametrize("farmers", [3, 30])
+def test_list_farmers_query_count_is_constant(db, client, farmers):
+    seed_farmers(db, farmers)
+
+    with count_statements() as statements:
+        response = client.get("/farmers/all", params={"limit": 50})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == farmers
+    assert all(len(farmer["crops_grown"]) == 2 for farmer in body)
+    # One page query plus one IN query for the crops, however many farmers are listed
+    assert len(statements) == 2, statements